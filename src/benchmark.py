@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from argparse import ArgumentParser
+from functools import partial
+from random import Random
+from typing import List, Sequence, Tuple
+
+from numpy import percentile
+
+from network import MatchServer, BotClient, LinkConditions, LoopbackLink, open_udp
+from network.protocol import LEAVE, MESSAGE_KIND
+
+from config import LOGGING, BENCHMARK, ANIMATIONS
+
+
+logging.basicConfig(
+    format='[%(asctime)s] %(thread)s %(levelname)s :  %(message)s'
+)
+logging.getLogger().setLevel(LOGGING["level"])
+
+
+PERCENTILES = (50, 95, 99)
+
+
+def _summary(values: Sequence[float], scale: float = 1) -> str:
+    """Formats the percentiles and the maximum of some values
+
+    Args:
+        values (Sequence[float]): the measured values
+        scale (float, optional): multiplies the values. Defaults to 1.
+
+    Returns:
+        str: the summary
+    """
+    if not values:
+        return "no samples"
+
+    return "  ".join(
+        [f"p{p}={value * scale:.3f}" for p, value in zip(PERCENTILES, percentile(values, PERCENTILES))] +
+        [f"max={max(values) * scale:.3f}", f"samples={len(values)}"]
+    )
+
+
+async def benchmark(bots: int, duration: float, conditions: LinkConditions, seed: int):
+    """Runs a match server and bot clients connected through loopback links
+    and reports the bandwidth, the tick times and the prediction error
+
+    Args:
+        bots (int): the number of bot clients
+        duration (float): the number of seconds to play
+        conditions (LinkConditions): the conditions of each direction of the links
+        seed (int): seeds the links and the inputs of the bots
+    """
+    server = MatchServer()
+    random = Random(seed)
+
+    clients: List[Tuple[BotClient, LoopbackLink, LoopbackLink]] = list()
+    for index in range(bots):
+        address = ("loopback", index)
+
+        downlink = LoopbackLink(None, conditions, Random(random.random()))
+        uplink = LoopbackLink(
+            lambda data, address=address, downlink=downlink: server.handle_message(address, data, downlink.send),
+            conditions,
+            Random(random.random())
+        )
+
+        bot = BotClient(uplink.send, Random(random.random()))
+        downlink.receive = bot.handle_message
+
+        clients.append((bot, uplink, downlink))
+
+    logging.info("Running %s bots for %s seconds with %s", bots, duration, conditions)
+
+    tasks = [asyncio.create_task(bot.run()) for bot, _, _ in clients]
+    await asyncio.sleep(duration)
+
+    matches = list(server.matches.values())
+    tick_times = [tick_time for match in matches for tick_time in match.tick_times]
+
+    for task in tasks:
+        task.cancel()
+    for match in matches:
+        if match.task is not None:
+            match.task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    #* REPORT
+    print(f"matches: {len(matches)}  bots: {bots}  duration: {duration}s")
+    print(f"tick time (ms): {_summary(tick_times, 1000)}")
+
+    prediction_errors = list()
+    for index, (bot, uplink, downlink) in enumerate(clients):
+        prediction_errors.extend(bot.prediction_errors)
+
+        print(
+            f"bot {index}: "
+            f"down={downlink.bytes_sent / duration / 1024:.2f}KiB/s ({downlink.packets_lost}/{downlink.packets_sent} lost)  "
+            f"up={uplink.bytes_sent / duration / 1024:.2f}KiB/s ({uplink.packets_lost}/{uplink.packets_sent} lost)  "
+            f"snapshots={bot.snapshots_received}"
+        )
+
+    print(f"prediction error (px): {_summary(prediction_errors)}")
+
+
+async def benchmark_remote(bots: int, duration: float, host: str, port: int, seed: int):
+    """Runs bot clients against a running server over UDP and reports
+    the snapshots they received and the prediction error
+
+    Args:
+        bots (int): the number of bot clients
+        duration (float): the number of seconds to play
+        host (str): the address of the server
+        port (int): the port of the server or of its supervisor
+        seed (int): seeds the inputs of the bots
+    """
+    random = Random(seed)
+
+    clients: List[BotClient] = list()
+    for _ in range(bots):
+        bot = BotClient(None, Random(random.random()))
+        bot.connect = partial(open_udp, host, receive=bot.handle_message)
+        bot.send = await bot.connect(port)
+
+        clients.append(bot)
+
+    logging.info("Running %s bots for %s seconds against %s:%s", bots, duration, host, port)
+
+    tasks = [asyncio.create_task(bot.run()) for bot in clients]
+    await asyncio.sleep(duration)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    for bot in clients:
+        bot.send(MESSAGE_KIND.pack(LEAVE))
+
+    #* REPORT
+    print(f"bots: {bots}  duration: {duration}s")
+
+    prediction_errors = list()
+    for index, bot in enumerate(clients):
+        prediction_errors.extend(bot.prediction_errors)
+
+        print(f"bot {index}: port={bot.port}  entity={bot.entity_id}  snapshots={bot.snapshots_received}")
+
+    print(f"prediction error (px): {_summary(prediction_errors)}")
+
+
+def main():
+    parser = ArgumentParser(description="Measures the netcode with bot clients over a simulated network")
+    parser.add_argument("--bots", type=int, default=BENCHMARK["bots"])
+    parser.add_argument("--duration", type=float, default=BENCHMARK["duration"])
+    parser.add_argument("--seed", type=int, default=BENCHMARK["seed"])
+    parser.add_argument("--latency", type=float, default=BENCHMARK["link"]["latency"], help="one way latency in seconds")
+    parser.add_argument("--jitter", type=float, default=BENCHMARK["link"]["jitter"], help="seconds")
+    parser.add_argument("--loss", type=float, default=BENCHMARK["link"]["loss"], help="probability of dropping a datagram")
+    parser.add_argument("--reorder", type=float, default=BENCHMARK["link"]["reorder"], help="probability of delaying a datagram past the next ones")
+    parser.add_argument("--live-poses", action="store_true", help="animate the entities with live inverse kinematics instead of the baked poses")
+    parser.add_argument("--server", help="host:port of a running server to play against over UDP instead of the loopback links")
+    args = parser.parse_args()
+
+    # must be set before the animations are loaded
+    if args.live_poses:
+        ANIMATIONS["cache_poses"] = False
+
+    if args.server is not None:
+        host, port = args.server.rsplit(":", 1)
+        asyncio.run(benchmark_remote(args.bots, args.duration, host, int(port), args.seed))
+        return
+
+    conditions: LinkConditions = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "loss": args.loss,
+        "reorder": args.reorder,
+    }
+
+    asyncio.run(benchmark(args.bots, args.duration, conditions, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,3 @@
 from .collider import Collider
+from .collider_grid import ColliderGrid, RayHit
+from .merging import merge_colliders
@@ -0,0 +1,325 @@
+from math import floor, hypot, inf
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple, TypedDict, Union
+
+from numpy import (
+    arange, array, broadcast_to, ceil, concatenate, cumsum, flatnonzero, floor_divide,
+    float64, full, int64, lexsort, ndarray, ones, repeat, sqrt, where, zeros
+)
+from pygame import Rect, Vector2
+
+from config import MAPS
+from utils import segment_entry, paired_segments_entries
+
+from .collider import Collider
+
+
+class RayHit(TypedDict):
+    collider: Collider
+    distance: float
+    point: Vector2
+
+
+class ColliderGrid:
+    """A static spatial hash of the colliders of a room
+
+    Each collider is stored in every cell of a uniform grid that it overlaps
+    so a query only tests the colliders in the cells of the queried area.
+    The colliders are returned in the order they were added so the collisions
+    resolve in the same order as iterating the whole list
+    """
+
+    def __init__(self, colliders: List[Collider], cell_size: int = MAPS["collider_cell_size"]) -> None:
+        """Constructor of the class ColliderGrid
+
+        Args:
+            colliders (List[Collider]): the colliders of the room
+            cell_size (int, optional): the size of the side of a cell. Defaults to MAPS["collider_cell_size"].
+        """
+        self.colliders = colliders
+        self.cell_size = cell_size
+
+        # left, top, right, bottom and friction of every collider for the batched physics
+        self.boxes = array(
+            [
+                (collider.bounding_box.left, collider.bounding_box.top, collider.bounding_box.right, collider.bounding_box.bottom)
+                for collider in colliders
+            ],
+            dtype=float64
+        ).reshape(-1, 4)
+        self.frictions = array([collider.friction for collider in colliders], dtype=float64)
+
+        # first and last cell that each collider overlaps on each axis
+        self.cell_ranges = floor_divide(self.boxes - (0, 0, 1, 1), cell_size)
+
+        # indices of the colliders that overlap each cell
+        self.cells: Dict[Tuple[int, int], List[int]] = dict()
+
+        for index, collider in enumerate(colliders):
+            for cell in self._cells(collider.bounding_box):
+                self.cells.setdefault(cell, list()).append(index)
+
+        # the same cells as flat arrays for the batched raycasts, the cells of a grid that
+        # covers every collider are numbered by column and the colliders of a cell are
+        # cell_indices[cell_starts[cell]:cell_starts[cell + 1]]
+        cell_coords = array(list(self.cells), dtype=int64).reshape(-1, 2)
+        self.grid_origin = cell_coords.min(axis=0) if self.cells else zeros(2, dtype=int64)
+        self.grid_size = cell_coords.max(axis=0) - self.grid_origin + 1 if self.cells else zeros(2, dtype=int64)
+
+        cell_counts = zeros(self.grid_size[0] * self.grid_size[1], dtype=int64)
+        flat_cells = (cell_coords[:, 0] - self.grid_origin[0]) * self.grid_size[1] + cell_coords[:, 1] - self.grid_origin[1]
+        cell_counts[flat_cells] = [len(indices) for indices in self.cells.values()]
+
+        self.cell_starts = concatenate(((0,), cumsum(cell_counts)))
+        self.cell_indices = zeros(self.cell_starts[-1], dtype=int64)
+        for flat_cell, indices in zip(flat_cells.tolist(), self.cells.values()):
+            self.cell_indices[self.cell_starts[flat_cell]:self.cell_starts[flat_cell + 1]] = indices
+
+
+    def _cells(self, area: Rect) -> Iterator[Tuple[int, int]]:
+        """Yields the cells that an area overlaps
+
+        Args:
+            area (Rect): the area
+
+        Yields:
+            Tuple[int, int]: the coordinates of the cell
+        """
+        # the right and bottom edges are outside of a rect
+        for cell_x in range(area.left // self.cell_size, (area.right - 1) // self.cell_size + 1):
+            for cell_y in range(area.top // self.cell_size, (area.bottom - 1) // self.cell_size + 1):
+                yield cell_x, cell_y
+
+
+    def query(self, area: Rect) -> List[Collider]:
+        """Returns the colliders in the cells that an area overlaps
+
+        Args:
+            area (Rect): the area
+
+        Returns:
+            List[Collider]: the colliders that may collide with the area
+        """
+        indices = set()
+        for cell in self._cells(area):
+            indices.update(self.cells.get(cell, ()))
+
+        return [self.colliders[index] for index in sorted(indices)]
+
+
+    def raycast(self, origin: Union[Vector2, Sequence[float]], direction: Union[Vector2, Sequence[float]], max_dist: float) -> Optional[RayHit]:
+        """Returns the first collider that a ray hits
+
+        The ray walks through the cells of the grid in order (DDA) and only
+        tests the colliders of the cells it crosses, it stops at the first cell
+        that ends after the closest hit so far since no later cell can hold
+        a closer one
+
+        Args:
+            origin (Vector2 | Sequence[float]): the start of the ray
+            direction (Vector2 | Sequence[float]): the direction of the ray, it doesn't need to be normalized
+            max_dist (float): the length of the ray (pixels)
+
+        Returns:
+            Optional[RayHit]: the collider, the distance to it and the point where the ray enters it
+            or None if the ray doesn't hit any collider
+        """
+        origin_x, origin_y = origin
+        length = hypot(direction[0], direction[1])
+        if length == 0 or max_dist <= 0:
+            return None
+
+        direction_x = direction[0] / length
+        direction_y = direction[1] / length
+        end_x = origin_x + direction_x * max_dist
+        end_y = origin_y + direction_y * max_dist
+
+        cell_x = floor(origin_x / self.cell_size)
+        cell_y = floor(origin_y / self.cell_size)
+
+        # distance along the ray to the next vertical and horizontal cell border
+        # and between two borders on the same axis
+        step_x = 1 if direction_x > 0 else -1
+        step_y = 1 if direction_y > 0 else -1
+        next_x = ((cell_x + (step_x > 0)) * self.cell_size - origin_x) / direction_x if direction_x != 0 else inf
+        next_y = ((cell_y + (step_y > 0)) * self.cell_size - origin_y) / direction_y if direction_y != 0 else inf
+        delta_x = self.cell_size / abs(direction_x) if direction_x != 0 else inf
+        delta_y = self.cell_size / abs(direction_y) if direction_y != 0 else inf
+
+        closest: Optional[int] = None
+        closest_distance = inf
+        tested: Set[int] = set()
+
+        distance = 0.0
+        while distance <= max_dist:
+            for index in self.cells.get((cell_x, cell_y), ()):
+                if index in tested:
+                    continue
+                tested.add(index)
+
+                entry = segment_entry(origin_x, origin_y, end_x, end_y, *self.boxes[index].tolist())
+                if entry is None:
+                    continue
+
+                # ties go to the first collider like the other collision queries
+                entry *= max_dist
+                if entry < closest_distance or (entry == closest_distance and index < closest):
+                    closest = index
+                    closest_distance = entry
+
+            distance = min(next_x, next_y)
+            if closest_distance <= distance:
+                break
+
+            if next_x < next_y:
+                cell_x += step_x
+                next_x += delta_x
+            else:
+                cell_y += step_y
+                next_y += delta_y
+
+        if closest is None:
+            return None
+
+        return {
+            "collider": self.colliders[closest],
+            "distance": closest_distance,
+            "point": Vector2(origin_x + direction_x * closest_distance, origin_y + direction_y * closest_distance)
+        }
+
+
+    def _ray_cells(self, starts: ndarray, directions: ndarray, ends: ndarray) -> Tuple[ndarray, ndarray]:
+        """Returns the cells that each ray crosses, the same ones that raycast walks through
+
+        A ray crosses a cell border on each axis every cell_size pixels, so the distance
+        to every border is known up front. Sorting the borders of each ray by distance
+        gives the order in which the ray leaves one cell for the next
+
+        Args:
+            starts (ndarray): the start of each ray (n x 2)
+            directions (ndarray): the normalized direction of each ray (n x 2)
+            ends (ndarray): the end of each ray (n x 2)
+
+        Returns:
+            Tuple[ndarray, ndarray]: the index of the ray of each cell and the coordinates of the cell (k x 2)
+        """
+        rays = arange(len(starts))
+        first_cells = floor_divide(starts, self.cell_size).astype(int64)
+        steps = where(directions > 0, 1, -1)
+
+        # the borders on each axis between the start and the end of each ray, a ray that ends
+        # exactly on a border enters the next cell like in raycast
+        crossings = where(
+            directions > 0,
+            floor_divide(ends, self.cell_size) - first_cells,
+            where(directions < 0, first_cells - ceil(ends / self.cell_size) + 1, 0)
+        ).astype(int64)
+
+        crossing_rays = list()
+        crossing_axes = list()
+        crossing_distances = list()
+        for axis in (0, 1):
+            counts = crossings[:, axis]
+            ray = repeat(rays, counts)
+
+            # the number of the border along the ray, from 1
+            border = arange(counts.sum()) - repeat(cumsum(counts) - counts, counts) + 1
+            border_coords = (first_cells[ray, axis] + where(steps[ray, axis] > 0, border, 1 - border)) * self.cell_size
+
+            crossing_rays.append(ray)
+            crossing_axes.append(full(len(ray), axis))
+            crossing_distances.append((border_coords - starts[ray, axis]) / directions[ray, axis])
+
+        ray = concatenate(crossing_rays)
+        axis = concatenate(crossing_axes)
+
+        # raycast steps on the y axis first when the ray crosses both borders at the same distance
+        order = lexsort((1 - axis, concatenate(crossing_distances), ray))
+        ray = ray[order]
+        is_x = axis[order] == 0
+
+        # the borders crossed on each axis so far by each ray, counted from the first border of the ray
+        totals = crossings.sum(axis=1)
+        first_border = repeat(cumsum(totals) - totals, totals)
+        crossed_x = cumsum(is_x)
+        crossed_y = cumsum(~is_x)
+        crossed_x -= concatenate(((0,), crossed_x))[first_border]
+        crossed_y -= concatenate(((0,), crossed_y))[first_border]
+
+        cells = first_cells[ray] + steps[ray] * array((crossed_x, crossed_y)).T
+
+        return concatenate((rays, ray)), concatenate((first_cells, cells)).reshape(-1, 2)
+
+
+    def raycasts(self, origins: ndarray, directions: ndarray, max_dist: Union[float, ndarray]) -> Tuple[ndarray, ndarray]:
+        """Casts many rays at once
+
+        The cells that the rays cross are found with array operations and only
+        the colliders of those cells are clipped against the rays, in a single
+        vectorized pass instead of walking the grid for each ray in python
+
+        Args:
+            origins (ndarray): the start of each ray (n x 2)
+            directions (ndarray): the direction of each ray, they don't need to be normalized (n x 2)
+            max_dist (float | ndarray): the length of the rays or of each ray (n)
+
+        Returns:
+            Tuple[ndarray, ndarray]: the index in colliders of the collider that each ray hits first
+            (-1 on a miss) and the distance to it (inf on a miss)
+        """
+        closest = full(len(origins), -1)
+        closest_distances = full(len(origins), inf)
+
+        lengths = sqrt((directions ** 2).sum(axis=1))
+        max_dists = broadcast_to(array(max_dist, dtype=float64), lengths.shape)
+
+        # a ray with no direction doesn't hit anything
+        rays = flatnonzero((lengths > 0) & (max_dists > 0))
+        if not self.colliders or not len(rays):
+            return closest, closest_distances
+
+        starts = origins[rays].astype(float64)
+        units = directions[rays] / lengths[rays, None]
+        ends = starts + units * max_dists[rays, None]
+
+        # the cells outside of the grid have no colliders
+        cell_rays, cells = self._ray_cells(starts, units, ends)
+        cells -= self.grid_origin
+        inside = ((cells >= 0) & (cells < self.grid_size)).all(axis=1)
+        cell_rays = cell_rays[inside]
+        flat_cells = cells[inside, 0] * self.grid_size[1] + cells[inside, 1]
+
+        # every collider of every cell that each ray crosses, a collider in many cells is tested again
+        counts = self.cell_starts[flat_cells + 1] - self.cell_starts[flat_cells]
+        pair_rays = repeat(cell_rays, counts)
+        pair_colliders = self.cell_indices[
+            repeat(self.cell_starts[flat_cells], counts) + arange(counts.sum()) - repeat(cumsum(counts) - counts, counts)
+        ]
+
+        hits, distances = paired_segments_entries(starts[pair_rays], ends[pair_rays], self.boxes[pair_colliders])
+        pair_rays = pair_rays[hits]
+        pair_colliders = pair_colliders[hits]
+        distances = distances[hits]
+
+        # the closest hit of each ray, ties go to the first collider like the other collision queries
+        order = lexsort((pair_colliders, distances, pair_rays))
+        pair_rays = pair_rays[order]
+
+        first = ones(len(order), dtype=bool)
+        first[1:] = pair_rays[1:] != pair_rays[:-1]
+
+        closest[rays[pair_rays[first]]] = pair_colliders[order][first]
+        closest_distances[rays[pair_rays[first]]] = distances[order][first]
+
+        return closest, closest_distances
+
+
+    def __iter__(self) -> Iterator[Collider]:
+        return iter(self.colliders)
+
+
+    def __len__(self) -> int:
+        return len(self.colliders)
+
+
+    def __repr__(self) -> str:
+        return f"ColliderGrid(colliders={len(self.colliders)}, cells={len(self.cells)}, cell_size={self.cell_size})"
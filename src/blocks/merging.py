@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional, Tuple
+
+from .collider import Collider
+
+
+# left, top, right and bottom of a collider
+Box = Tuple[int, int, int, int]
+
+
+def _merge(box: Box, other: Box) -> Optional[Box]:
+    """Returns the box that covers exactly the area of two boxes
+
+    Args:
+        box (Box): a box
+        other (Box): another box
+
+    Returns:
+        Optional[Box]: the merged box or None if the area of the boxes isn't a rectangle
+    """
+    left, top, right, bottom = box
+    other_left, other_top, other_right, other_bottom = other
+
+    # one box is inside the other
+    if left <= other_left and top <= other_top and right >= other_right and bottom >= other_bottom:
+        return box
+
+    if other_left <= left and other_top <= top and other_right >= right and other_bottom >= bottom:
+        return other
+
+    # side by side on the same rows, touching or overlapping
+    if top == other_top and bottom == other_bottom and left <= other_right and other_left <= right:
+        return min(left, other_left), top, max(right, other_right), bottom
+
+    # on top of each other on the same columns, touching or overlapping
+    if left == other_left and right == other_right and top <= other_bottom and other_top <= bottom:
+        return left, min(top, other_top), right, max(bottom, other_bottom)
+
+    return None
+
+
+def merge_colliders(colliders: List[Collider]) -> List[Collider]:
+    """Merges the adjacent or overlapping colliders with the same friction
+
+    Two colliders are only merged if together they cover a rectangle so the
+    merged colliders cover the exact same area as the original ones.
+    Merging is repeated until no two colliders can be merged, which turns
+    a block made of tiles into a single collider
+
+    Args:
+        colliders (List[Collider]): the colliders
+
+    Returns:
+        List[Collider]: the merged colliders in the order that their frictions first appear
+    """
+    groups: Dict[int, List[Box]] = dict()
+    for collider in colliders:
+        groups.setdefault(collider.friction, list()).append(
+            (collider.bounding_box.left, collider.bounding_box.top, collider.bounding_box.right, collider.bounding_box.bottom)
+        )
+
+    merged_colliders: List[Collider] = list()
+    for friction, boxes in groups.items():
+
+        merged = True
+        while merged:
+            merged = False
+
+            i = 0
+            while i < len(boxes):
+                j = i + 1
+                while j < len(boxes):
+                    box = _merge(boxes[i], boxes[j])
+
+                    if box is None:
+                        j += 1
+                        continue
+
+                    # the merged box may now merge with the ones that were already checked
+                    boxes[i] = box
+                    del boxes[j]
+                    merged = True
+
+                i += 1
+
+        for left, top, right, bottom in boxes:
+            merged_colliders.append(Collider((left, top), (right - left, bottom - top), friction))
+
+    return merged_colliders
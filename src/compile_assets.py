@@ -0,0 +1,89 @@
+import logging
+from argparse import ArgumentParser
+from os import walk
+from os.path import exists, getmtime, join
+from typing import Dict, List, Optional
+
+from numpy import ndarray
+
+from entities.animation import compile_animation
+from inverse_kinematics import compile_model
+from utils import load_json, compiled_path, save_compiled
+
+from config import LOGGING, ASSETS
+
+
+logging.basicConfig(
+    format='[%(asctime)s] %(thread)s %(levelname)s :  %(message)s'
+)
+logging.getLogger().setLevel(LOGGING["level"])
+
+
+def compile_asset(path: str) -> Optional[Dict[str, ndarray]]:
+    """Compiles a json model or animation into arrays
+
+    Args:
+        path (str): the path to the json file
+
+    Returns:
+        Optional[Dict[str, ndarray]]: the arrays or None if the file isn't a model or an animation
+    """
+    json_asset = load_json(path)
+    if not isinstance(json_asset, dict):
+        return None
+
+    if "segments" in json_asset:
+        return compile_model(json_asset)
+
+    if "keyframes" in json_asset:
+        return compile_animation(json_asset)
+
+    return None
+
+
+def compile_assets(folders: List[str], force: bool = False):
+    """Compiles the json models and animations in some folders
+    into binary files next to them
+
+    Args:
+        folders (List[str]): the folders to search, including their sub folders
+        force (bool, optional): compile the files that are up to date as well. Defaults to False.
+    """
+    compiled = up_to_date = skipped = 0
+
+    for folder in folders:
+        for directory, _, files in walk(folder):
+            for file_name in sorted(files):
+                if not file_name.endswith(".json"):
+                    continue
+
+                path = join(directory, file_name)
+
+                if not force and exists(compiled_path(path)) and getmtime(compiled_path(path)) >= getmtime(path):
+                    up_to_date += 1
+                    continue
+
+                arrays = compile_asset(path)
+                if arrays is None:
+                    logging.warning("'%s' isn't a model or an animation", path)
+                    skipped += 1
+                    continue
+
+                save_compiled(path, arrays)
+                logging.info("Compiled '%s'", path)
+                compiled += 1
+
+    print(f"compiled: {compiled}  up to date: {up_to_date}  skipped: {skipped}")
+
+
+def main():
+    parser = ArgumentParser(description="Compiles the json models and animations into binary files that load faster")
+    parser.add_argument("folders", nargs="*", default=ASSETS["folders"], help="the folders with the json files")
+    parser.add_argument("--force", action="store_true", help="compile the files that are up to date as well")
+    args = parser.parse_args()
+
+    compile_assets(args.folders, args.force)
+
+
+if __name__ == "__main__":
+    main()
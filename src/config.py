@@ -26,11 +26,16 @@ else:
     LOGGING = config["logging"]
     WINDOW = config["window"]
     PHYSICS = config["physics"]
+    SIMULATION = config["simulation"]
     INPUT = config["input"]
+    SERVER = config["server"]
+    NETWORK = config["network"]
+    BENCHMARK = config["benchmark"]
     ENTITIES = config["entities"]
     ENEMIES = config["enemies"]
     ANIMATIONS = config["animations"]
     MODELS = config["models"]
+    ASSETS = config["assets"]
     MAPS = config["maps"]
     SPRITES = config["sprites"]
     DEBUG = config["debugging"]
@@ -1,4 +1,4 @@
 from .entity import Entity
-from .skeleton_animated import SkeletonAnimated
+from .skeleton_animated import SkeletonAnimated, update_models
 from .player import Player
 from .enemy import Enemy
@@ -1 +1,2 @@
-from .animation import Animation, JSONAnimation, JSONKeyframe, Keyframe
+from .animation import Animation, JSONAnimation, JSONKeyframe, Keyframe, Pose, compile_animation
+from .registry import load_animation, load_model, load_template
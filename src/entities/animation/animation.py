@@ -1,5 +1,6 @@
 from typing import Dict, List, Tuple, TypedDict
 
+from numpy import array, float64, ndarray, trunc
 from pygame import Vector2
 
 from inverse_kinematics import Skeleton
@@ -10,10 +11,39 @@ Keyframe = Dict[str, Tuple[Vector2, int]]
 
 BoneName = str
 
+# the points of the bones of a model relative to its origin and their angles on a keyframe
+Pose = Tuple[ndarray, ndarray]
+
 class JSONAnimation(TypedDict):
     keyframeNum: int
     keyframes: Tuple[JSONKeyframe]
 
+def compile_animation(json_animation: JSONAnimation) -> Dict[str, ndarray]:
+    """Stores a json animation in arrays that can be saved in a binary file
+
+    Args:
+        json_animation (JSONAnimation): the json encoded animation keyframes
+
+    Returns:
+        Dict[str, ndarray]: the names of the bones, the target of each bone on each keyframe
+        (keyframes x bones x 2), the direction of each bone on each keyframe and the skeleton anchors
+    """
+    bone_names = list(json_animation["keyframes"][0])
+
+    return {
+        "num_keyframes": array(json_animation["keyframeNum"]),
+        "bones": array(bone_names),
+        "targets": array(
+            [[json_keyframe[bone_name][0] for bone_name in bone_names] for json_keyframe in json_animation["keyframes"]],
+            dtype=float64
+        ).reshape(-1, len(bone_names), 2),
+        "directions": array(
+            [[json_keyframe[bone_name][1] for bone_name in bone_names] for json_keyframe in json_animation["keyframes"]]
+        ).reshape(-1, len(bone_names)),
+        "skeleton_anchors": array(json_animation["skeletonAnchorKeyframes"], dtype=float64).reshape(-1, 2)
+    }
+
+
 class Animation:
     """Stores the target points of an animation
     """
@@ -24,6 +54,9 @@ class Animation:
         self.keyframes: List[Keyframe] = list()
         self.bones_order: List[BoneName] = list()
 
+        # the solved pose of each keyframe for each direction, empty until the poses are baked
+        self.poses: Dict[int, List[Pose]] = dict()
+
 
     @classmethod
     def from_json(cls, json_animation: JSONAnimation, skeleton: Skeleton, scale: float = 1.0):
@@ -33,35 +66,51 @@ class Animation:
             json_animation (JSONAnimation): the json encoded animation keyframes
             scale (float, Optional): the scale
 
+        Returns:
+            Animation: the instanced animation
+        """
+        return cls.from_arrays(compile_animation(json_animation), skeleton, scale)
+
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, ndarray], skeleton: Skeleton, scale: float = 1.0):
+        """Creates an instance of an Animation from the arrays of a compiled animation
+
+        Args:
+            arrays (Dict[str, ndarray]): the arrays made by compile_animation
+            skeleton (Skeleton): the skeleton that the animation moves
+            scale (float, Optional): the scale
+
         Returns:
             Animation: the instanced animation
         """
         # instanciate the animation
         animation = cls()
-        animation.num_keyframes = json_animation['keyframeNum']
+        animation.num_keyframes = int(arrays["num_keyframes"])
+
+        bone_names: List[BoneName] = arrays["bones"].tolist()
+
+        # the coords of the targets are truncated before being scaled
+        targets = (trunc(arrays["targets"]) * scale).tolist()
+        directions = arrays["directions"].tolist()
 
         # convert the keyframe targets to pygame Vector2
-        for json_keyframe in json_animation['keyframes']:
+        for keyframe_targets, keyframe_directions in zip(targets, directions):
 
             keyframe = {
-                bone_name: (
-                    Vector2(int(target_point[0]), int(target_point[1])) * scale,
-                    direction
-                )
-                for bone_name, (target_point, direction) in json_keyframe.items()
+                bone_name: (Vector2(target_point), direction)
+                for bone_name, target_point, direction in zip(bone_names, keyframe_targets, keyframe_directions)
             }
 
             animation.keyframes.append(keyframe)
 
         # convert the skeleton anchor position to pygame Vector2
-        for anchor_keyframe in json_animation['skeletonAnchorKeyframes']:
-            animation.skeleton_anchor_keyframes.append(
-                Vector2(int(anchor_keyframe[0]), int(anchor_keyframe[1])) * scale
-            )
+        for anchor_keyframe in (trunc(arrays["skeleton_anchors"]) * scale).tolist():
+            animation.skeleton_anchor_keyframes.append(Vector2(anchor_keyframe))
 
 
         # the order that the bones should be animated
-        for bone_name in animation.keyframes[0]:
+        for bone_name in bone_names:
             if skeleton.get_limb(bone_name) is None:
                 animation.bones_order.insert(0, bone_name)
                 continue
@@ -0,0 +1,69 @@
+from functools import lru_cache
+import logging
+
+from config import ASSETS
+from inverse_kinematics import Skeleton, JSONSkeleton, decompile_model
+from utils import load_json, load_compiled
+
+from .animation import Animation, JSONAnimation
+
+
+@lru_cache(maxsize=None)
+def load_model(model_path: str) -> JSONSkeleton:
+    """Loads a model from its compiled file if it is up to date or from its json file otherwise,
+    only once so the model must not be modified
+
+    Args:
+        model_path (str): the path to the json file of the model
+
+    Returns:
+        JSONSkeleton: the json model
+    """
+    arrays = load_compiled(model_path) if ASSETS["compiled"] else None
+    if arrays is None:
+        logging.debug("Loading the json model '%s'", model_path)
+        return load_json(model_path)
+
+    return decompile_model(arrays)
+
+
+@lru_cache(maxsize=None)
+def load_template(model_path: str, scale: float = 1.0) -> Skeleton:
+    """Creates the skeleton of a model only once, the following calls
+    return the same skeleton so it must not be modified
+
+    Entities create their own skeleton to animate, the template is only
+    used to read the structure of the model
+
+    Args:
+        model_path (str): the path to the json file of the model
+        scale (float, optional): the scale of the model. Defaults to 1.0.
+
+    Returns:
+        Skeleton: the template skeleton
+    """
+    return Skeleton.from_json(load_model(model_path), scale)
+
+
+@lru_cache(maxsize=None)
+def load_animation(animation_path: str, model_path: str, scale: float = 1.0) -> Animation:
+    """Creates an animation of a model only once, the following calls
+    return the same animation so every entity with the same model shares
+    it and it must not be modified
+
+    Args:
+        animation_path (str): the path to the json file of the animation
+        model_path (str): the path to the json file of the model that it animates
+        scale (float, optional): the scale of the model. Defaults to 1.0.
+
+    Returns:
+        Animation: the animation
+    """
+    arrays = load_compiled(animation_path) if ASSETS["compiled"] else None
+    if arrays is None:
+        logging.debug("Loading the json animation '%s'", animation_path)
+        json_animation: JSONAnimation = load_json(animation_path)
+
+        return Animation.from_json(json_animation, load_template(model_path, scale), scale)
+
+    return Animation.from_arrays(arrays, load_template(model_path, scale), scale)
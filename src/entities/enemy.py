@@ -1,11 +1,12 @@
-from typing import List
+from typing import Dict, Optional
 
 from pygame import Surface, Vector2
 from pygame.draw import line
 
 
 from config import ENTITIES, MODELS, ANIMATIONS, ENEMIES
-from blocks import Collider
+from blocks import Collider, ColliderGrid
+from utils import BoundingBox
 
 from .skeleton_animated import SkeletonAnimated
 from .player import Player
@@ -57,11 +58,41 @@ class Enemy(SkeletonAnimated):
         )
 
 
-    def update(self, colliders: List[Collider], player: Player):
-        previous_is_moving = self.is_moving
+    def update(self, colliders: ColliderGrid, player: Player, hurt_box: Optional[BoundingBox] = None):
+        """Updates the enemy's movement, player detection and damage
 
+        Args:
+            colliders (ColliderGrid): the colliders of the room
+            player (Player): the player to follow and take damage from
+            hurt_box (BoundingBox, optional): the bounding box to check the player's attacks against,
+            used to compensate the attacker's latency. Defaults to the current bounding box.
+        """
         collisions = super().update(colliders)
 
+        self.update_behaviour(collisions, player, hurt_box, colliders=colliders)
+
+
+    def update_behaviour(
+        self,
+        collisions: Dict[str, Optional[Collider]],
+        player: Player,
+        hurt_box: Optional[BoundingBox] = None,
+        in_reach: bool = True,
+        colliders: Optional[ColliderGrid] = None
+    ):
+        """Updates the enemy's movement, player detection and damage after its physics
+
+        Args:
+            collisions (Dict[str, Optional[Collider]]): the colliders that the enemy collided with
+            player (Player): the player to follow and take damage from
+            hurt_box (BoundingBox, optional): the bounding box to check the player's attacks against. Defaults to the current bounding box.
+            in_reach (bool, optional): False skips the attack test when a broadphase found that the
+            player's weapon can't reach the enemy. Defaults to True.
+            colliders (ColliderGrid, optional): the colliders of the room that block the sight of the enemy.
+            Defaults to None.
+        """
+        previous_is_moving = self.is_moving
+
         if not self.is_stunned and self.check_on_platform(collisions["top"]):
             self.move()
         else:
@@ -72,14 +103,21 @@ class Enemy(SkeletonAnimated):
         if not self.detected_player:
 
             # update detection ray to a fixed distance
+            eyes = self.model.get_bone("pescoco").a
             self.detection_ray.update(
-                self.model.get_bone("pescoco").a +
+                eyes +
                 self.direction * Vector2(ENEMIES["player_detection_ray_size"], 0) +
                 self.vel
             )
 
+            # the ray stops at the first collider in the way
+            if colliders is not None:
+                hit = colliders.raycast(eyes, self.detection_ray - eyes, eyes.distance_to(self.detection_ray))
+                if hit is not None:
+                    self.detection_ray.update(hit["point"])
+
             self.detected_player = player.bounding_box.collideline(
-                (self.model.get_bone("pescoco").a, self.detection_ray)
+                (eyes, self.detection_ray)
             )
 
         # if the player has been detected then follow him
@@ -91,8 +129,11 @@ class Enemy(SkeletonAnimated):
 
 
         #* taking damage
-        if player.is_attacking and player.weapon.hitbox is not None and player.weapon.validate_attack(player.current_keyframe, player.attack_sequence - 1):
-            if self.hit_frame == -1 and player.weapon.hitbox.colliderect(self.bounding_box):
+        if hurt_box is None:
+            hurt_box = self.bounding_box
+
+        if in_reach and player.is_attacking and player.weapon.hitbox is not None and player.weapon.validate_attack(player.current_keyframe, player.attack_sequence - 1):
+            if self.hit_frame == -1 and player.weapon.hitbox.colliderect(hurt_box):
                 self.hit_frame = player.current_keyframe * player.attack_sequence
 
 
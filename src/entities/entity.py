@@ -1,14 +1,68 @@
 import logging
-from typing import Dict, List, Union, Literal, Tuple
+from math import inf
+from typing import Dict, List, Optional, Union, Literal, Tuple
 from pygame import Surface, Vector2
 from pygame.draw import rect
 
 from utils import BoundingBox
-from blocks import Collider
+from blocks import Collider, ColliderGrid
 
 from config import PHYSICS, ENTITIES, DEBUG
 
 
+def _axis_times(start_min: float, start_max: float, collider_min: float, collider_max: float, move: float) -> Tuple[float, float]:
+    """Returns the fractions of a movement at which an interval starts and stops
+    overlapping a static interval on one axis
+
+    Args:
+        start_min (float): the start of the moving interval
+        start_max (float): the end of the moving interval
+        collider_min (float): the start of the static interval
+        collider_max (float): the end of the static interval
+        move (float): the movement on the axis
+
+    Returns:
+        Tuple[float, float]: the entry and the exit times
+    """
+    if move > 0:
+        return (collider_min - start_max) / move, (collider_max - start_min) / move
+
+    if move < 0:
+        return (collider_max - start_min) / move, (collider_min - start_max) / move
+
+    # not moving on the axis, the intervals either always or never overlap
+    if start_min < collider_max and start_max > collider_min:
+        return -inf, inf
+
+    return inf, -inf
+
+
+def time_of_impact(box: Tuple[float, float, float, float], move: Tuple[float, float], collider: BoundingBox) -> Optional[Tuple[float, str]]:
+    """Sweeps a box along a movement and returns when and on which side of a collider it hits
+
+    Args:
+        box (Tuple[float, float, float, float]): the left, top, right and bottom of the moving box
+        move (Tuple[float, float]): the movement of the box
+        collider (BoundingBox): the bounding box of the collider
+
+    Returns:
+        Optional[Tuple[float, str]]: the fraction of the movement before the hit and the side
+        of the collider that was hit or None if the box doesn't hit the collider
+    """
+    entry_x, exit_x = _axis_times(box[0], box[2], collider.left, collider.right, move[0])
+    entry_y, exit_y = _axis_times(box[1], box[3], collider.top, collider.bottom, move[1])
+
+    entry = max(entry_x, entry_y)
+    if entry >= min(exit_x, exit_y) or entry < 0 or entry > 1:
+        return None
+
+    # the last axis to start overlapping is the one that was hit
+    if entry_y >= entry_x:
+        return entry, "top" if move[1] > 0 else "bottom"
+
+    return entry, "left" if move[0] > 0 else "right"
+
+
 class Entity:
     """An entity handles basic physics calculations
     and movement. It's bounding_box can also be drawn on the screen
@@ -21,6 +75,9 @@ class Entity:
             bounding_box_size (tuple): the size of the bounding_box
             hasGravity (bool): whether to enable gravity to the object or not. Defaults to True.
         """
+        # identifies the entity in a simulation, assigned by the Simulation object
+        self.entity_id: int = -1
+
         self.pos = Vector2(0,0)
 
         self.bounding_box = BoundingBox((0,0), bounding_box_size)
@@ -28,6 +85,9 @@ class Entity:
         # velocity
         self.vel = Vector2(0,0)
 
+        # position before the last update, the collisions are swept from here
+        self.previous_pos = Vector2(0,0)
+
         self.has_gravity = has_gravity
         self.max_vel_x = max_vel_x
         self.max_vel_y = max_vel_y
@@ -83,6 +143,8 @@ class Entity:
         """Calculates the new position based on the velocity
         also handles gravity calculations
         """
+        self.previous_pos.update(self.pos)
+
         # updating the vellocity
         if self.has_gravity and not self.is_climbing:
             logging.debug("GRAVITY_CALCULATION")
@@ -110,11 +172,12 @@ class Entity:
 
 
 
-    def check_collisions(self, colliders: List[Collider]) -> Dict[str, Union[Collider, None]]:
-        """Handles collisions between this entity and colliders on a given list
+    def check_collisions(self, colliders: ColliderGrid) -> Dict[str, Union[Collider, None]]:
+        """Handles collisions between this entity and the colliders of the room
+        that are near the area it swept on this tick
 
         Args:
-            colliders (list): the list of colliders in the level
+            colliders (ColliderGrid): the colliders of the room
 
         Returns:
             Dict[str, Union[Collider, None]]: the colliders that the entity collided with
@@ -129,8 +192,17 @@ class Entity:
             "right": None
         }
 
-        # iterate through colliders
-        for collider in colliders:
+        # the area covered by the bounding box since the last tick
+        # with a margin for the fractional part of the positions
+        swept_box = self.bounding_box.union(self.bounding_box.move(-self.vel.x, -self.vel.y)).inflate(2, 2)
+        candidates = colliders.query(swept_box)
+
+        #? CONTINUOUS COLLISIONS
+        self.sweep(candidates, collisions)
+
+        #? OVERLAPS
+        # the entity started the tick inside a collider
+        for collider in candidates:
 
             # found a collision
             if self.bounding_box.colliderect(collider.bounding_box):
@@ -161,39 +233,118 @@ class Entity:
                 # collision handling
                 if min_dist == "top":
                     self.bounding_box.bottom = collider.bounding_box.top
-                    self.vel.y = 0
-                    self.is_jumping = False
-                    self.is_grounded = True
-                    collisions["top"] = collider
-
-                    # calculate friction when the entity is not moving
-                    if not self.is_moving:
-
-                        # friction
-                        if self.vel.x < 0:
-                            self.vel.x = self.vel.x + collider.friction if self.vel.x + collider.friction < 0 else 0
-
-                        elif self.vel.x > 0:
-                            self.vel.x = self.vel.x - collider.friction if self.vel.x - collider.friction > 0 else 0
+                    self.land(collider)
 
                 elif min_dist == "left":
                     self.bounding_box.right = collider.bounding_box.left
                     self.vel.x = 0
-                    collisions["left"] = collider
                 elif min_dist == "right":
                     self.bounding_box.left = collider.bounding_box.right
                     self.vel.x = 0
-                    collisions["right"] = collider
                 else:
                     self.bounding_box.top = collider.bounding_box.bottom
                     self.vel.y = 0
-                    collisions["bottom"] = collider
+
+                collisions[min_dist] = collider
 
                 self.pos.update(self.bounding_box.midbottom)
 
         return collisions
 
 
+    def sweep(self, colliders: List[Collider], collisions: Dict[str, Union[Collider, None]]):
+        """Moves the entity from its previous position to the current one stopping
+        at the first collider on the way, the rest of the movement slides along the
+        side that was hit. Fast entities can't go through thin colliders this way
+
+        Args:
+            colliders (List[Collider]): the colliders near the entity
+            collisions (Dict[str, Union[Collider, None]]): the colliders that the entity collided with
+        """
+        half_width = self.bounding_box.width // 2
+        width = self.bounding_box.width
+        height = self.bounding_box.height
+
+        # midbottom of the bounding box
+        pos_x, pos_y = self.previous_pos
+        move_x = self.pos.x - pos_x
+        move_y = self.pos.y - pos_y
+
+        has_collided = False
+
+        for _ in range(PHYSICS["sweep_iterations"]):
+            box = (pos_x - half_width, pos_y - height, pos_x - half_width + width, pos_y)
+
+            # the first collider on the way
+            impact = None
+            for collider in colliders:
+                collider_impact = time_of_impact(box, (move_x, move_y), collider.bounding_box)
+
+                if collider_impact is not None and (impact is None or collider_impact[0] < impact[0]):
+                    impact = collider_impact + (collider,)
+
+            if impact is None:
+                break
+
+            time, side, collider = impact
+            has_collided = True
+            self.is_colliding = True
+
+            # move until the hit and keep the rest of the movement
+            pos_x += move_x * time
+            pos_y += move_y * time
+            move_x *= 1 - time
+            move_y *= 1 - time
+
+            # stop against the side that was hit and slide along it
+            if side == "top":
+                pos_y = collider.bounding_box.top
+                move_y = 0
+                self.land(collider)
+
+            elif side == "bottom":
+                pos_y = collider.bounding_box.bottom + height
+                move_y = 0
+                self.vel.y = 0
+
+            elif side == "left":
+                pos_x = collider.bounding_box.left - width + half_width
+                move_x = 0
+                self.vel.x = 0
+
+            else:
+                pos_x = collider.bounding_box.right + half_width
+                move_x = 0
+                self.vel.x = 0
+
+            collisions[side] = collider
+
+        if has_collided:
+            self.pos.update(pos_x + move_x, pos_y + move_y)
+            self.bounding_box.midbottom = self.pos
+
+
+    def land(self, collider: Collider):
+        """Stops the fall of the entity on top of a collider
+
+        Args:
+            collider (Collider): the collider below the entity
+        """
+        self.vel.y = 0
+        self.is_jumping = False
+        self.is_grounded = True
+
+        # calculate friction when the entity is not moving
+        if not self.is_moving:
+
+            # friction
+            if self.vel.x < 0:
+                self.vel.x = self.vel.x + collider.friction if self.vel.x + collider.friction < 0 else 0
+
+            elif self.vel.x > 0:
+                self.vel.x = self.vel.x - collider.friction if self.vel.x - collider.friction > 0 else 0
+
+
     def show_bounding_box(self, canvas: Surface):
         """Draws a rectangle on the given canvas representing the bounding_box of the entity
 
@@ -1,19 +1,72 @@
 import logging
-from typing import Dict, List, Union
-from json import load
+from typing import Dict, List, Sequence, Tuple, Union
 
+from numpy import array, float64
 from pygame import Surface, Vector2
 
 from config import ANIMATIONS
-from blocks import Collider
-from inverse_kinematics import Skeleton
+from blocks import Collider, ColliderGrid
+from inverse_kinematics import Skeleton, Limb, follow_limbs
 from weapons import Weapon
 
-from .animation import Animation, JSONAnimation
+from .animation import Animation, Pose, load_animation, load_model
 from .entity import Entity
 
 ANIMATION_FRAME_SKIP: int = int(1 / ANIMATIONS["animation_speed"])
 
+# a limb of a model with the target and the direction that it follows on a keyframe
+LimbTarget = Tuple[Limb, Vector2, int]
+
+
+def update_models(entities: Sequence["SkeletonAnimated"], colliders: ColliderGrid):
+    """Moves the models of many entities to their positions and animates them,
+    runs after the physics of the entities
+
+    Same as calling update_model on each entity but the limbs of all
+    the entities that animate with live inverse kinematics are solved together
+
+    Args:
+        entities (Sequence[SkeletonAnimated]): the entities
+        colliders (ColliderGrid): the colliders of the room
+    """
+    animated: List[SkeletonAnimated] = list()
+    limb_targets: List[LimbTarget] = list()
+
+    for entity in entities:
+        entity.place_model()
+
+        if entity.current_animation is None:
+            continue
+
+        entity.finished_animation = False
+        if not entity.apply_cached_pose(entity.current_animation):
+            limb_targets.extend(entity.pose(entity.current_animation))
+        animated.append(entity)
+
+    _follow(limb_targets)
+
+    for entity in animated:
+        entity.advance_animation(entity.current_animation)
+
+
+def _follow(limb_targets: List[LimbTarget]):
+    """Makes the limbs follow their targets
+
+    Args:
+        limb_targets (List[LimbTarget]): the limbs, their targets and directions
+    """
+    if len(limb_targets) < ANIMATIONS["batched_limbs_threshold"]:
+        for limb, target, direction in limb_targets:
+            limb.follow(target, direction)
+
+        return
+
+    follow_limbs(
+        [limb for limb, _, _ in limb_targets],
+        array([tuple(target) for _, target, _ in limb_targets], dtype=float64).reshape(-1, 2),
+        array([direction for _, _, direction in limb_targets], dtype=float64)
+    )
+
 
 class SkeletonAnimated(Entity):
     """A SkeletonAnimated entity has a skeleton based model and
@@ -34,9 +87,9 @@ class SkeletonAnimated(Entity):
         logging.info("Loading model '%s'", model_path)
 
         # model initialization
-        with open(model_path, "r", encoding="utf-8") as model_file:
-            json_model = load(model_file)
+        json_model = load_model(model_path)
 
+        self.model_path = model_path
         self.model = Skeleton.from_json(json_model, scale)
 
         # keyframe setup
@@ -50,6 +103,12 @@ class SkeletonAnimated(Entity):
         self.load_animations(animation_paths, scale)
         self.finished_animation: bool = False
 
+        # entities that move bones away from the keyframes set this to animate with
+        # live inverse kinematics, it is reserved for planting the feet on the ground
+        # (docs/Notes/plan_to_procedural_animation.md) which isn't implemented yet, until
+        # then the live path only runs with animations.cache_poses off
+        self.procedural_pose: bool = False
+
 
         # stun
         self.stun_frames: int = 0
@@ -70,6 +129,9 @@ class SkeletonAnimated(Entity):
     def load_animations(self, animation_paths: Dict[str, str], scale: float = 1.0):
         """Loads all the animations of the model from the
         corresponding json files
+
+        The animations are shared with the other entities that have the
+        same model, so their poses are only baked by the first one
         """
 
         for animation_name, animation_path in animation_paths.items():
@@ -80,13 +142,13 @@ class SkeletonAnimated(Entity):
                 animation_path
             )
 
-            with open(animation_path, "r", encoding="utf-8") as animation_file:
-                json_animation: JSONAnimation = load(animation_file)
-
-            animation = Animation.from_json(json_animation, self.model, scale)
+            animation = load_animation(animation_path, self.model_path, scale)
 
             self.animations[animation_name] = animation
 
+            if ANIMATIONS["cache_poses"] and not animation.poses:
+                self.bake_poses(animation_name)
+
             logging.info(
                 "Loaded '%s' animation ('%s' keyframes)",
                 animation_name,
@@ -94,25 +156,118 @@ class SkeletonAnimated(Entity):
             )
 
 
+    def bake_poses(self, animation_name: str):
+        """Solves the pose of every keyframe of an animation in both directions
+        and stores them in the animation
+
+        The keyframe targets are relative to the origin of the model so the
+        pose only has to be moved to the origin when it is applied.
+        Each keyframe is posed twice because the skeleton anchor is placed
+        with the angle of the last pose, the second time is the pose that
+        the keyframe settles on
+
+        Args:
+            animation_name (str): the name of the animation
+        """
+        animation = self.animations[animation_name]
+
+        points = self.model.points.copy()
+        angles = self.model.angles.copy()
+        direction = self.direction
+        current_keyframe = self.current_keyframe
+
+        origin = array(tuple(self.model.origin), dtype=float64)
+
+        for self.direction in (1, -1):
+            poses: List[Pose] = list()
+
+            for keyframe in range(animation.num_keyframes):
+                self.current_keyframe = keyframe
+
+                for _ in range(2):
+                    _follow(self.pose(animation_name))
+
+                pose_points = self.model.points - origin
+                pose_angles = self.model.angles.copy()
+
+                # the animation is shared between the entities
+                pose_points.setflags(write=False)
+                pose_angles.setflags(write=False)
+
+                poses.append((pose_points, pose_angles))
+
+            animation.poses[self.direction] = poses
+
+        self.model.points[...] = points
+        self.model.angles[...] = angles
+        self.direction = direction
+        self.current_keyframe = current_keyframe
+
+
     def set_weapon(self, weapon: Weapon, bone: str):
         self.weapon = weapon
         self.weapon.attach(self.model.get_bone(bone))
 
 
 
-    def animate(self, animation_name: str, colliders: list):
+    def animate(self, animation_name: str, colliders: ColliderGrid):
         """Animates each model bone with a list of points
         on the given animation
 
         Args:
             animation_name (str): the name of the current animation
-            colliders (list): the list of colliders in the map
+            colliders (ColliderGrid): the colliders of the room
         """
         if self.current_animation is None:
             return
 
         self.finished_animation = False
 
+        if not self.apply_cached_pose(animation_name):
+            _follow(self.pose(animation_name))
+
+        self.advance_animation(animation_name)
+
+
+    def apply_cached_pose(self, animation_name: str) -> bool:
+        """Moves the model to the baked pose of the current keyframe of an animation
+
+        Args:
+            animation_name (str): the name of the current animation
+
+        Returns:
+            bool: True if the pose was applied, False if the animation has no baked poses
+            or the entity animates with live inverse kinematics
+        """
+        if self.procedural_pose:
+            return False
+
+        poses = self.animations[animation_name].poses.get(self.direction)
+        if poses is None:
+            return False
+
+        points, angles = poses[self.current_keyframe]
+
+        self.model.points[...] = points + (self.model.origin.x, self.model.origin.y)
+        self.model.angles[...] = angles
+
+        return True
+
+
+    def pose(self, animation_name: str) -> List[LimbTarget]:
+        """Moves the skeleton anchor and the bones that aren't part of a limb
+        to the current keyframe of an animation
+
+        The limbs are anchored to those bones so they are attached here
+        but are left for the caller to solve, which may solve the limbs
+        of many entities at once
+
+        Args:
+            animation_name (str): the name of the current animation
+
+        Returns:
+            List[LimbTarget]: the limbs with the targets and directions that they follow
+        """
         skeleton_anchor = self.animations[animation_name].skeleton_anchor_keyframes[self.current_keyframe]
 
         self.model.skeleton_anchor.b.update(
@@ -121,21 +276,36 @@ class SkeletonAnimated(Entity):
         self.model.skeleton_anchor.calculate_other()
 
 
+        limb_targets: List[LimbTarget] = list()
+
         keyframe = self.animations[animation_name].keyframes[self.current_keyframe]
         for bone_name in self.animations[animation_name].bones_order:
+            target = self.model.origin + (keyframe[bone_name][0].x * self.direction, keyframe[bone_name][0].y)
+            direction = keyframe[bone_name][1] * self.direction
+
             # try to get a limb
-            bone = self.model.get_limb(bone_name)
+            limb = self.model.get_limb(bone_name)
+
+            if limb is not None:
+                limb.update()
+                limb_targets.append((limb, target, direction))
+                continue
 
             # if it doesnt correspond to a limb then get the bone instead
-            if bone is None:
-                bone = self.model.get_bone(bone_name)
+            bone = self.model.get_bone(bone_name)
 
             bone.update()
-            bone.follow(
-                self.model.origin + (keyframe[bone_name][0].x * self.direction, keyframe[bone_name][0].y),
-                keyframe[bone_name][1] * self.direction
-            )
+            bone.follow(target, direction)
+
+        return limb_targets
 
+
+    def advance_animation(self, animation_name: str):
+        """Updates the weapon to the solved model and moves to the next keyframe
+
+        Args:
+            animation_name (str): the name of the current animation
+        """
         # update the weapons
         if self.weapon is not None:
             self.weapon.update(self.direction)
@@ -208,32 +378,62 @@ class SkeletonAnimated(Entity):
 
 
 
-    def update(self, colliders: List[Collider]) -> Dict[str, Union[Collider, None]]:
+    def update(self, colliders: ColliderGrid) -> Dict[str, Union[Collider, None]]:
         """Makes the necessary computations to update the physics of the entity
         and handles model animations
+
+        Args:
+            colliders (ColliderGrid): the colliders of the room
         """
-        self.is_climbing = False
+        collisions = self.update_physics(colliders)
 
-        vector = self.model.origin - self.model.skeleton_anchor.get_pos()
+        self.update_model(colliders)
 
+        return collisions
+
+
+    def update_physics(self, colliders: ColliderGrid) -> Dict[str, Union[Collider, None]]:
+        """Moves the entity and resolves its collisions
+
+        Args:
+            colliders (ColliderGrid): the colliders of the room
+
+        Returns:
+            Dict[str, Union[Collider, None]]: the colliders that the entity collided with
+        """
+        self.is_climbing = False
 
         # calculate position based on velocity
         super().update()
 
 
         #? COLLISIONS
-        collisions = self.check_collisions(colliders)
+        return self.check_collisions(colliders)
+
 
+    def update_model(self, colliders: ColliderGrid):
+        """Moves the model to the position of the entity and animates it,
+        runs after the physics of the entity
+
+        Args:
+            colliders (ColliderGrid): the colliders of the room
+        """
+        self.place_model()
+
+        self.animate(self.current_animation, colliders)
+
+
+    def place_model(self):
+        """Moves the origin of the model to the position of the entity
+        """
         #? updates the model's bones
         # move the origin of the model to the position of
         # the bounding_box and update the anchor bone as well
+        vector = self.model.origin - self.model.skeleton_anchor.get_pos()
+
         self.model.set_origin(self.pos)
         self.model.skeleton_anchor.set_pos(self.model.origin - vector)
 
-        self.animate(self.current_animation, colliders)
-
-        return collisions
-
 
     def show_bounding_box(self, canvas: Surface):
         super().show_bounding_box(canvas)
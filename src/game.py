@@ -1,4 +1,7 @@
 import logging
+from time import perf_counter
+from typing import List
+
 from guiElements.inputs import Label
 from pygame.draw import circle
 from pygame import Surface
@@ -8,11 +11,9 @@ from window import Window
 from events import GameEvents
 from utils import MovementKeys, AttackKeys
 
-from entities import Player
-from weapons import Sword, Bow
-
-from config import MAPS
-from maps import Map
+from config import MAPS, WINDOW
+from entities import SkeletonAnimated
+from simulation import Simulation, RenderInterpolator
 
 
 class Game:
@@ -35,19 +36,36 @@ class Game:
 
         logging.info("Loading game assets")
 
+        # simulation
+        # runs at its own tick rate, the frames are interpolated between the last two ticks
+        self.simulation = Simulation(headless=False)
+        self.interpolator = RenderInterpolator()
+
+        # time that wasn't simulated yet (seconds)
+        self.accumulator: float = 0
+
         # map
-        self.map = Map()
+        self.map = self.simulation.map
 
         # player
-        self.player = Player((30,250))
-        self.player.set_pos((900,400))
-        self.player.current_room.update(self.map.map_size // 2, self.map.map_size // 2)
+        self.player = self.simulation.add_player()
+        self.interpolator.capture(self.rendered_entities())
 
-        self.player.set_weapon(Sword(), "braco_e")
+
+    def rendered_entities(self) -> List[SkeletonAnimated]:
+        """Returns the entities that are drawn on the screen
+
+        Returns:
+            List[SkeletonAnimated]: the enemies of the current room and the player
+        """
+        return self.map.get_room(self.player.current_room).enemies + [self.player]
 
 
-    def update_display(self):
+    def update_display(self, alpha: float = 1):
         """Updates the pygame display and renders objects on screen
+
+        Args:
+            alpha (float, optional): how far the frame is from the previous tick to the current one. Defaults to 1.
         """
 
         #! BACKGROUND
@@ -58,15 +76,21 @@ class Game:
         current_map_room = self.map.get_room(self.player.current_room)
 
 
-        #! ENEMIES
-        for enemy in current_map_room.enemies:
-            enemy.blit(self.canvas)
-            enemy.show_bounding_box(self.canvas)
+        with self.interpolator.interpolate(self.rendered_entities(), alpha):
 
+            #! ENEMIES
+            for enemy in current_map_room.enemies:
+                enemy.blit(self.canvas)
+                enemy.show_bounding_box(self.canvas)
+
+
+            #! PLAYER
+            self.player.blit(self.canvas)
+            self.player.show_bounding_box(self.canvas)
 
-        #! PLAYER
-        self.player.blit(self.canvas)
-        self.player.show_bounding_box(self.canvas)
+            #* DEBUGGING
+            circle(self.canvas, "green", self.player.model.origin, 4)
+            circle(self.canvas, "green", self.player.model.get_bone("tronco").a, 4)
 
 
         #! DRAWING THE ROOM BLOCKS
@@ -76,10 +100,6 @@ class Game:
         #! SHOWING THE COLLIDERS (DEBUG)
         current_map_room.show_bounding_boxes(self.canvas)
 
-        #* DEBUGGING
-        circle(self.canvas, "green", self.player.model.origin, 4)
-        circle(self.canvas, "green", self.player.model.get_bone("tronco").a, 4)
-
 
         # transforming the canvas to match the screen size
         self.root.blit(scale(self.canvas, self.root.canvas.get_size()), (0,0))
@@ -94,11 +114,21 @@ class Game:
 
     def mainloop(self):
         """Main loop of the game
+
+        The simulation is stepped as many times as the time since the last frame
+        allows at its tick rate and the frame is drawn between the last two ticks
         """
+        tick_interval = self.simulation.tick_interval
+        last_frame = perf_counter()
 
         while self.events.getEvent("windowState"):
             self.root.tick()
 
+            now = perf_counter()
+            # a long frame only catches up on a few ticks instead of stalling on all of them
+            self.accumulator = min(self.accumulator + now - last_frame, WINDOW["max_ticks_per_frame"] * tick_interval)
+            last_frame = now
+
             #! EVENTS
             self.events.eventsCheck()
             movement_keys: MovementKeys = {
@@ -113,39 +143,18 @@ class Game:
             }
 
 
-            #! MAP
-            current_map_room = self.map.get_room(self.player.current_room)
-
-            #! ENEMIES
-            for enemy in current_map_room.enemies:
-                enemy.update(current_map_room.colliders, self.player)
-
-
-            #! PLAYER
-            self.player.move(movement_keys)
-            self.player.attack(attack_keys)
-            self.player.update(current_map_room.colliders)
-
-
-
-            #! MAP NAVIGATION
-            if self.player.bounding_box.right < 0 and self.map.get_room(self.player.current_room + (-1,0)) is not None:
-                self.player.current_room += (-1,0)
-                self.player.set_pos((MAPS["room_size"][0] - self.player.bounding_box.width, self.player.pos.y))
-
-            elif self.player.bounding_box.left > MAPS["room_size"][0] and self.map.get_room(self.player.current_room + (1,0)) is not None:
-                self.player.current_room += (1,0)
-                self.player.set_pos((self.player.bounding_box.width, self.player.pos.y))
-
-            elif self.player.bounding_box.top > MAPS["room_size"][1] and self.map.get_room(self.player.current_room + (0,1)) is not None:
-                self.player.current_room += (0,1)
-                self.player.set_pos((self.player.pos.x, self.player.bounding_box.height))
+            #! SIMULATION
+            while self.accumulator >= tick_interval:
+                self.simulation.step({
+                    self.player.entity_id: {
+                        "movement": movement_keys,
+                        "attack": attack_keys
+                    }
+                })
+                self.interpolator.capture(self.rendered_entities())
 
-            elif self.player.bounding_box.bottom < 0 and self.map.get_room(self.player.current_room + (0,-1)) is not None:
-                self.player.current_room += (0,-1)
-                self.player.set_pos((self.player.pos.x, 0))
-                self.player.vel.y -= 10
+                self.accumulator -= tick_interval
 
             self.fps_counter.setText(f"FPS: {self.root.get_fps():.0f}", (0,0,0))
 
-            self.update_display()
+            self.update_display(self.accumulator / tick_interval)
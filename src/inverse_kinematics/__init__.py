@@ -1,5 +1,6 @@
 from .bone import Bone
 from .skeleton import Skeleton
-from .limb import Limb
+from .limb import Limb, follow_limbs
 from .exceptions import LimbTooLongException, PointNotFoundException, InvalidPointException, InvalidLinkException
 from .types import Segment, JSONSkeleton
+from .compiled import compile_model, decompile_model
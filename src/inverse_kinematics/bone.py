@@ -1,6 +1,7 @@
 from math import sin, cos, radians
-from typing import Sequence
+from typing import Sequence, Union
 
+from numpy import array, float64, ndarray, zeros
 from pygame import Vector2
 from pygame import Surface
 from pygame.draw import line
@@ -9,10 +10,140 @@ from .exceptions import PointNotFoundException
 
 from config import DEBUG
 
+
+class BonePoint:
+    """An end point of a bone
+
+    It behaves like a pygame Vector2 but its coordinates are stored in the arrays
+    of the skeleton, so the bones, limbs and weapons that hold on to the point
+    see the changes made by the vectorized updates of the skeleton.
+    The coords are read through a memoryview of the array, which returns
+    python floats as fast as a list instead of numpy scalars
+    """
+
+    __slots__ = ("_point",)
+
+    def __init__(self, point: ndarray) -> None:
+        """Constructor of the class BonePoint
+
+        Args:
+            point (ndarray): the x and y coords of the point in the skeleton's arrays
+        """
+        self._point = memoryview(point)
+
+
+    def bind(self, point: ndarray):
+        """Moves the point to new arrays, keeping the objects that refer to it valid
+
+        Args:
+            point (ndarray): the x and y coords of the point in the new arrays
+        """
+        self._point = memoryview(point)
+
+
+    @property
+    def x(self) -> float:
+        return self._point[0]
+
+    @x.setter
+    def x(self, value: float):
+        self._point[0] = value
+
+    @property
+    def y(self) -> float:
+        return self._point[1]
+
+    @y.setter
+    def y(self, value: float):
+        self._point[1] = value
+
+
+    def update(self, *args: Union[float, Sequence[float]]):
+        """Sets the coords of the point like Vector2.update
+
+        Args:
+            args (float | Sequence[float]): the x and y coords or a point
+        """
+        if len(args) == 2:
+            self._point[0], self._point[1] = args
+
+        # copy between the arrays without going through python floats
+        elif isinstance(args[0], BonePoint):
+            self._point[:] = args[0]._point
+
+        else:
+            self._point[0], self._point[1] = args[0]
+
+
+    def copy(self) -> Vector2:
+        """Returns the point as a new Vector2
+
+        Returns:
+            Vector2: the copy
+        """
+        return Vector2(self._point[0], self._point[1])
+
+
+    def angle_to(self, other: Sequence[float]) -> float:
+        return self.copy().angle_to(other)
+
+    def distance_to(self, other: Sequence[float]) -> float:
+        return self.copy().distance_to(other)
+
+    def length(self) -> float:
+        return self.copy().length()
+
+
+    def __len__(self) -> int:
+        return 2
+
+    def __getitem__(self, index: int) -> float:
+        return self._point[index]
+
+    def __setitem__(self, index: int, value: float):
+        self._point[index] = value
+
+    def __iter__(self):
+        return iter(self._point)
+
+    def __add__(self, other: Sequence[float]) -> Vector2:
+        return self.copy() + other
+
+    def __radd__(self, other: Sequence[float]) -> Vector2:
+        return other + self.copy()
+
+    def __sub__(self, other: Sequence[float]) -> Vector2:
+        return self.copy() - other
+
+    def __rsub__(self, other: Sequence[float]) -> Vector2:
+        return other - self.copy()
+
+    def __mul__(self, other: float) -> Vector2:
+        return self.copy() * other
+
+    def __rmul__(self, other: float) -> Vector2:
+        return other * self.copy()
+
+    def __neg__(self) -> Vector2:
+        return -self.copy()
+
+    def __eq__(self, other: object) -> bool:
+        return self.copy() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"BonePoint({self.x}, {self.y})"
+
+
 class Bone:
     def __init__(self, x: int, y: int, length: float, angle: float, name: str = "") -> None:
         """Constructor of the class Bone
 
+        The points, the length and the angle are stored in arrays of their own
+        until the bone is added to a skeleton, then the bone is a view of a line
+        of the skeleton's arrays
+
         Args:
             x (int): the x coord of the bone
             y (int): the y coord of the bone
@@ -20,17 +151,22 @@ class Bone:
             angle (float): the angle of the bone (degrees)
             name (str): the name of the bone
         """
+        # the skeleton that stores the bone and the line of the bone in its arrays
+        self.skeleton = None
+        self.index = 0
 
-        self.a = Vector2(x, y)
+        self._lengths = memoryview(array((length,), dtype=float64))
+        self._angles = memoryview(array((angle,), dtype=float64))
 
-        self.length = length
-        self.angle = angle
+        points = zeros((1, 2, 2), dtype=float64)
+        self.a = BonePoint(points[0, 0])
+        self.b = BonePoint(points[0, 1])
+
+        self.a.update(x, y)
 
         self.name = name
 
         # calculate b
-        self.b = Vector2(0, 0)
-
         self.calculate_b()
 
         # joint
@@ -43,22 +179,61 @@ class Bone:
         self.attachment_is_b = 1
 
 
+    def bind(self, skeleton, index: int):
+        """Makes the bone a view of a line of the arrays of a skeleton
+
+        Args:
+            skeleton (Skeleton): the skeleton
+            index (int): the line of the bone in the arrays
+        """
+        self.skeleton = skeleton
+        self.index = index
+
+        self._lengths = memoryview(skeleton.lengths)
+        self._angles = memoryview(skeleton.angles)
+
+        self.a.bind(skeleton.points[index, 0])
+        self.b.bind(skeleton.points[index, 1])
+
+
+    @property
+    def length(self) -> float:
+        return self._lengths[self.index]
+
+    @length.setter
+    def length(self, value: float):
+        self._lengths[self.index] = value
+
+    @property
+    def angle(self) -> float:
+        return self._angles[self.index]
+
+    @angle.setter
+    def angle(self, value: float):
+        self._angles[self.index] = value
+
 
     def calculate_b(self):
         """Calculates the B point of the bone based on the length and the angle
         """
+        length = self._lengths[self.index]
+        angle = radians(self._angles[self.index])
+        a = self.a._point
+        b = self.b._point
 
-        self.b.update(
-            self.a + Vector2(self.length * cos(radians(self.angle)), self.length * sin(radians(self.angle)))
-        )
+        b[0] = a[0] + length * cos(angle)
+        b[1] = a[1] + length * sin(angle)
 
     def calculate_other(self):
         """Calculates the B point of the bone based on the length and the angle
         """
+        length = self._lengths[self.index]
+        angle = radians(self._angles[self.index] + 180 * self.attachment_is_b)
+        attachment = self.attachment._point
+        other = self.other._point
 
-        self.other.update(
-            self.attachment + Vector2(self.length * cos(radians(self.angle + 180 * self.attachment_is_b)), self.length * sin(radians(self.angle + 180 * self.attachment_is_b)))
-        )
+        other[0] = attachment[0] + length * cos(angle)
+        other[1] = attachment[1] + length * sin(angle)
 
 
     def set_pos(self, pos: tuple):
@@ -113,7 +288,9 @@ class Bone:
             target (Vector2): the target to follow
         """
 
-        self.angle = (self.angle + (self.other - self.attachment).angle_to(target - self.attachment)) % 360
+        attachment = self.attachment.copy()
+
+        self.angle = (self.angle + (self.other.copy() - attachment).angle_to(target - attachment)) % 360
 
         self.calculate_other()
 
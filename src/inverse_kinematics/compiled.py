@@ -0,0 +1,65 @@
+from typing import Dict
+
+from numpy import array, bool_, float64, ndarray
+
+from .types import JSONSkeleton
+
+
+def compile_model(json_model: JSONSkeleton) -> Dict[str, ndarray]:
+    """Stores a json model in arrays that can be saved in a binary file
+
+    Args:
+        json_model (JSONSkeleton): the json model
+
+    Returns:
+        Dict[str, ndarray]: the arrays of the model, one row per segment
+    """
+    segments = json_model["segments"]
+
+    return {
+        "name": array(json_model["name"]),
+        "origin": array(json_model["origin"]),
+        "names": array([segment["name"] for segment in segments]),
+        "a": array([segment["a"] for segment in segments], dtype=float64),
+        "b": array([segment["b"] for segment in segments], dtype=float64),
+        "angles": array([segment["angle"] for segment in segments], dtype=float64),
+        "lengths": array([segment["length"] for segment in segments], dtype=float64),
+        # a segment without a link has an empty string
+        "links": array([[link or "" for link in segment["links"]] for segment in segments]),
+        "anchors": array([segment["isAnchor"] for segment in segments], dtype=bool_)
+    }
+
+
+def decompile_model(arrays: Dict[str, ndarray]) -> JSONSkeleton:
+    """Turns the arrays of a compiled model back into a json model
+
+    Args:
+        arrays (Dict[str, ndarray]): the arrays of the model
+
+    Returns:
+        JSONSkeleton: the json model
+    """
+    return {
+        "name": arrays["name"].item(),
+        "origin": arrays["origin"].tolist(),
+        "segments": [
+            {
+                "name": name,
+                "a": a,
+                "b": b,
+                "angle": angle,
+                "length": length,
+                "links": [link or None for link in links],
+                "isAnchor": anchor
+            }
+            for name, a, b, angle, length, links, anchor in zip(
+                arrays["names"].tolist(),
+                arrays["a"].tolist(),
+                arrays["b"].tolist(),
+                arrays["angles"].tolist(),
+                arrays["lengths"].tolist(),
+                arrays["links"].tolist(),
+                arrays["anchors"].tolist()
+            )
+        ]
+    }
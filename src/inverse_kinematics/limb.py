@@ -1,6 +1,7 @@
 from math import acos, atan2, degrees, pi, cos, sin
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 
+from numpy import arccos, arctan2, array, cos as cos_, degrees as degrees_, float64, maximum, minimum, ndarray, radians, sin as sin_, sqrt, where
 from pygame import Surface, Vector2
 
 from .bone import Bone
@@ -8,6 +9,78 @@ from .bone import Bone
 from .exceptions import LimbTooLongException, PointNotFoundException
 
 
+# the lengths of the bones of a limb and the terms of the law of cosines that only depend on them:
+# length_0, length_1, |length_0 - length_1|, length_0 + length_1,
+# length_0² - length_1², length_0² + length_1², 2 * length_0 and 2 * length_0 * length_1
+LengthTerms = Tuple[float, float, float, float, float, float, float, float]
+
+
+def follow_limbs(limbs: Sequence["Limb"], targets: ndarray, directions: ndarray):
+    """Makes many limbs follow their targets at once
+
+    Solves the same law of cosines as Limb.follow for all the limbs with a few
+    array operations, the limbs can belong to different skeletons
+
+    Args:
+        limbs (Sequence[Limb]): the limbs, already attached to their anchors
+        targets (ndarray): the target of each limb (n x 2)
+        directions (ndarray): the direction that each limb bends to (1 or -1)
+    """
+    if not limbs:
+        return
+
+    terms = array([limb.length_terms() for limb in limbs], dtype=float64)
+    length_0, length_1, difference, total, squares_difference, squares_sum, double_0, double_product = terms.T
+
+    origins = array([tuple(limb.bones[0].a) for limb in limbs], dtype=float64)
+    origins_x = origins[:, 0]
+    origins_y = origins[:, 1]
+    vectors_x = targets[:, 0] - origins_x
+    vectors_y = targets[:, 1] - origins_y
+    vector_angles = arctan2(vectors_y, vectors_x)
+
+    # how far the limb reaches towards the target
+    reach = maximum(difference, minimum(total, sqrt(vectors_x * vectors_x + vectors_y * vectors_y)))
+    distance_x = cos_(vector_angles) * reach
+    distance_y = sin_(vector_angles) * reach
+    distance_squared = distance_x * distance_x + distance_y * distance_y
+
+    temp_1 = minimum(maximum((squares_difference + distance_squared) / (double_0 * sqrt(distance_squared)), -1), 1)
+    theta_1 = -directions * arccos(temp_1) + vector_angles
+
+    temp_2 = minimum(maximum((squares_sum - distance_squared) / double_product, -1), 1)
+    theta_2 = arccos(temp_2) * -directions
+
+    angles_0 = degrees_(theta_1) % 360
+    angles_1 = degrees_(pi - (2 * pi - theta_2 - theta_1)) % 360
+
+    radians_0 = radians(angles_0)
+    points_b_0_x = origins_x + length_0 * cos_(radians_0)
+    points_b_0_y = origins_y + length_0 * sin_(radians_0)
+
+    # the second bone starts at the point of the first one that it follows
+    follows_b = array([limb.follow_point is limb.bones[0].b for limb in limbs])
+    points_a_1_x = where(follows_b, points_b_0_x, origins_x)
+    points_a_1_y = where(follows_b, points_b_0_y, origins_y)
+
+    radians_1 = radians(angles_1)
+    points_b_1_x = points_a_1_x + length_1 * cos_(radians_1)
+    points_b_1_y = points_a_1_y + length_1 * sin_(radians_1)
+
+    for limb, angle_0, angle_1, x_b_0, y_b_0, x_a_1, y_a_1, x_b_1, y_b_1 in zip(
+        limbs, angles_0.tolist(), angles_1.tolist(),
+        points_b_0_x.tolist(), points_b_0_y.tolist(),
+        points_a_1_x.tolist(), points_a_1_y.tolist(),
+        points_b_1_x.tolist(), points_b_1_y.tolist()
+    ):
+        bone_0, bone_1 = limb.bones
+        bone_0.angle = angle_0
+        bone_0.b.update(x_b_0, y_b_0)
+        bone_1.angle = angle_1
+        bone_1.a.update(x_a_1, y_a_1)
+        bone_1.b.update(x_b_1, y_b_1)
+
+
 class Limb:
 
     def __init__(self, name: str = "") -> None:
@@ -31,6 +104,9 @@ class Limb:
         self.attachment = None
         self.follow_point = None
 
+        # calculated on the first follow, the lengths of the bones don't change
+        self._length_terms: Optional[LengthTerms] = None
+
 
     def set_name(self, name: str):
         """Sets the name attribute to the given string
@@ -101,25 +177,57 @@ class Limb:
 
 
 
-    def follow(self, target: Vector2, direction: int = 1):
+    def length_terms(self) -> LengthTerms:
+        """Returns the terms of the law of cosines that only depend on the lengths of the bones
+
+        Raises:
+            LimbTooLongException: if the limb doesn't have exactly two bones
+
+        Returns:
+            LengthTerms: the lengths of the bones and the terms
+        """
+        if self._length_terms is not None:
+            return self._length_terms
+
         if len(self.bones) > 2:
             raise LimbTooLongException("Too many bones on " + self.name)
         elif len(self.bones) < 2:
             raise LimbTooLongException("Not enough bones on " + self.name)
 
+        length_0 = self.bones[0].length
+        length_1 = self.bones[1].length
+
+        self._length_terms = (
+            length_0,
+            length_1,
+            abs(length_0 - length_1),
+            length_0 + length_1,
+            length_0**2 - length_1**2,
+            length_0**2 + length_1**2,
+            2 * length_0,
+            2 * length_0 * length_1
+        )
+
+        return self._length_terms
+
+
+
+    def follow(self, target: Vector2, direction: int = 1):
+        _, _, difference, total, squares_difference, squares_sum, double_0, double_product = self.length_terms()
+
         # precisamos de um end effector -> target
         end_effector = target
 
         # temos que calcular o vetor do end effector
-        end_effector_vector = end_effector - self.bones[0].a
+        end_effector_vector = end_effector - self.bones[0].a.copy()
 
         # precisamos do angulo do vetor do end effector
         end_effector_vector_angle = atan2(end_effector_vector.y, end_effector_vector.x)
 
         # precisamos da distancia maxima que o membro pode esticar
         d = max(
-                abs(self.bones[0].length - self.bones[1].length),
-                min(self.bones[0].length + self.bones[1].length, end_effector_vector.length())
+                difference,
+                min(total, end_effector_vector.length())
             )
 
         # precisamos da distancia do ombro ao end effector
@@ -127,8 +235,8 @@ class Limb:
 
 
 
-        temp1 = ((self.bones[0].length**2 - self.bones[1].length**2 + distance.length_squared()) /
-            (2 * self.bones[0].length * distance.length()))
+        temp1 = ((squares_difference + distance.length_squared()) /
+            (double_0 * distance.length()))
 
         if temp1 < -1:
             temp1 = -1
@@ -138,8 +246,8 @@ class Limb:
         theta1 = -direction * acos(temp1) + end_effector_vector_angle
 
 
-        temp2 = ((self.bones[0].length**2 + self.bones[1].length**2 - distance.length_squared()) /
-            (2 * self.bones[0].length * self.bones[1].length))
+        temp2 = ((squares_sum - distance.length_squared()) /
+            double_product)
 
         if temp2 < -1:
             temp2 = -1
@@ -1,22 +1,33 @@
 from typing import List, Dict, Sequence, Union
 
+from numpy import array, concatenate, float64, ndarray, zeros
 from pygame import Surface, Vector2
 
 from .bone import Bone
 from .limb import Limb
 from .types import JSONSkeleton
 
+
 class Skeleton:
 
     def __init__(self) -> None:
         """Constructor of the class skeleton\n\n
 
         A skeleton is a set of bones that can be customized and controlled all at once
+
+        The points, lengths and angles of all the bones are stored in contiguous
+        arrays and each bone is a view of its line, so a whole pose can be read
+        or written with a few array operations instead of a method call per bone
         """
 
         self.bones: List[Bone] = list()
         self._names: Dict[str ,int] = dict()
 
+        # a and b of each bone (bones x 2 x 2)
+        self.points: ndarray = zeros((0, 2, 2), dtype=float64)
+        self.lengths: ndarray = zeros(0, dtype=float64)
+        self.angles: ndarray = zeros(0, dtype=float64)
+
         self.limbs: List[Limb] = list()
         self._limbs_names: Dict[str ,int] = dict()
 
@@ -53,6 +64,14 @@ class Skeleton:
         # add the bone to the list
         self.bones.append(bone)
 
+        # the arrays grow while the skeleton is built, every bone is moved to the new ones
+        self.points = concatenate((self.points, array(((tuple(bone.a), tuple(bone.b)),), dtype=float64)))
+        self.lengths = concatenate((self.lengths, (bone.length,)))
+        self.angles = concatenate((self.angles, (bone.angle,)))
+
+        for index, skeleton_bone in enumerate(self.bones):
+            skeleton_bone.bind(self, index)
+
 
     def new_limb(self, name: str = ""):
         """Adds a new limb to the skeleton
@@ -1,6 +1,5 @@
 import logging
 from typing import Dict, Tuple, Union
-from json import load
 from time import time_ns
 from datetime import datetime
 from os.path import join
@@ -9,15 +8,21 @@ from pygame import Vector2
 
 
 from config import DEBUG, MAPS
+from utils import load_json
 from .procedural_generation import WaveFuncionCollapse, Room
 
 
 class Map:
-    def __init__(self) -> None:
+    def __init__(self, headless: bool = False) -> None:
+        """Constructor of the class Map
+
+        Args:
+            headless (bool, optional): load the rooms without their textures. Defaults to False.
+        """
+        self.headless = headless
 
         # create a wfc generator to later generate the map rooms
-        with open(MAPS["room_rules"], "r", encoding="utf-8") as room_rules_file:
-            json_rooms = load(room_rules_file)
+        json_rooms = load_json(MAPS["room_rules"])
 
         self.wfc_generator = WaveFuncionCollapse.from_json(json_rooms)
 
@@ -51,12 +56,11 @@ class Map:
                 room_name = self.map_rooms[j][i]
 
                 # load the room from a json file with the corresponding name
-                with open(
-                    join(MAPS["rooms_folder"], f"{room_name}.json"),
-                    "r",
-                    encoding="utf-8",
-                ) as room_file:
-                    self.rooms[(j, i)] = Room.from_json(room_name, load(room_file))
+                self.rooms[(j, i)] = Room.from_json(
+                    room_name,
+                    load_json(join(MAPS["rooms_folder"], f"{room_name}.json")),
+                    self.headless
+                )
 
         logging.info(
             "Successfully loaded map. Took %s seconds",
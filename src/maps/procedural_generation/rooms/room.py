@@ -1,14 +1,16 @@
 import logging
-from typing import Dict, List
-from json import load
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from os.path import join
 
-from pygame import Surface
+from numpy import ndarray
+from pygame import Surface, Vector2
 from pygame.image import load as pgload
 from pygame.draw import rect
 
-from blocks import Collider
+from blocks import Collider, ColliderGrid, RayHit, merge_colliders
 from config import MAPS
+from utils import load_json
 from entities import Enemy
 
 from .json_types import JSONMap, MapFormat, MissingProperty, JSONTileset
@@ -32,14 +34,20 @@ rect(DEFAULT_TEXTURE, (255, 0, 255), (0, 16, 15, 31))
 
 
 class Room:
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, headless: bool = False) -> None:
         self.name = name
 
         self.colliders: List[Collider] = list()
 
+        # built once all the colliders are loaded
+        self.collider_grid = ColliderGrid(self.colliders)
+
         # layers
-        self.block_layer: Surface = Surface(MAPS["room_size"])
-        self.block_layer.set_colorkey((0, 0, 0))
+        # a headless room has no use for textures, only the colliders and the POIs are loaded
+        self.block_layer: Optional[Surface] = None
+        if not headless:
+            self.block_layer = Surface(MAPS["room_size"])
+            self.block_layer.set_colorkey((0, 0, 0))
 
 
         self.enemies: List[Enemy] = list()
@@ -54,56 +62,45 @@ class Room:
         for collider in self.colliders:
             collider.show_bounding_box(canvas)
 
-    @classmethod
-    def from_json(cls, name: str, json_room: JSONMap):
-        """Loads and renders the assets of a room in different Surface layers
+    def raycast(self, origin: Union[Vector2, Sequence[float]], direction: Union[Vector2, Sequence[float]], max_dist: float) -> Optional[RayHit]:
+        """Returns the first collider of the room that a ray hits
 
         Args:
-            name (str): the room name
-            json_room (JSONMap): the room formated json attributes
-
-        Raises:
-            MapFormat: In case the room file is not in the correct format
-            MissingProperty: If an object doesn't include a required property
+            origin (Vector2 | Sequence[float]): the start of the ray
+            direction (Vector2 | Sequence[float]): the direction of the ray
+            max_dist (float): the length of the ray (pixels)
 
         Returns:
-            Room: The rendered room
+            Optional[RayHit]: the collider, the distance to it and the point where the ray enters it
+            or None if the ray doesn't hit any collider
         """
-        logging.info("Loading '%s' room", name)
+        return self.collider_grid.raycast(origin, direction, max_dist)
 
-        room = cls(name)
+    def raycasts(self, origins: ndarray, directions: ndarray, max_dist: Union[float, ndarray]) -> Tuple[ndarray, ndarray]:
+        """Casts many rays against the colliders of the room at once
 
-        # check amount of layers
-        if len(json_room["layers"]) != len(LAYER_NAMES):
-            logging.fatal(
-                "Map file '%s' is in the wrong format. %s layers",
-                name,
-                len(json_room["layers"]) - len(LAYER_NAMES),
-            )
-            raise MapFormat(
-                f"Map file '{name}' is in the wrong format. {len(json_room['layers']) - len(LAYER_NAMES)} layers"
-            )
+        Args:
+            origins (ndarray): the start of each ray (n x 2)
+            directions (ndarray): the direction of each ray (n x 2)
+            max_dist (float | ndarray): the length of the rays or of each ray (n)
 
-        # check if a layer name is different or out of order
-        for i, layer in enumerate(json_room["layers"]):
-            if layer["name"] != LAYER_NAMES[i]:
-                logging.fatal(
-                    "Map file '%s' is in the wrong format. Layer '%s'",
-                    name,
-                    layer["name"],
-                )
-                raise MapFormat(
-                    f"Map file '{name}' is in the wrong format. Layer {layer['name']}"
-                )
+        Returns:
+            Tuple[ndarray, ndarray]: the index in colliders of the collider that each ray hits first
+            (-1 on a miss) and the distance to it (inf on a miss)
+        """
+        return self.collider_grid.raycasts(origins, directions, max_dist)
+
+    def render_block_layer(self, json_room: JSONMap):
+        """Loads the block tileset and renders the block layer of the room
 
+        Args:
+            json_room (JSONMap): the room formated json attributes
+        """
         # load tilesets
         # load the block tileset
-        with open(
-            join(MAPS["rooms_folder"], json_room["tilesets"][0]["source"]),
-            "r",
-            encoding="utf-8",
-        ) as tileset_file:
-            json_block_tileset: JSONTileset = load(tileset_file)
+        json_block_tileset: JSONTileset = load_json(
+            join(MAPS["rooms_folder"], json_room["tilesets"][0]["source"])
+        )
 
 
 
@@ -159,7 +156,7 @@ class Room:
                 )
                 loaded_tiles[tile_index] = sprite
 
-            room.block_layer.blit(
+            self.block_layer.blit(
                 loaded_tiles[tile_index],
                 (
                     (i % json_room["width"]) * tile_size,
@@ -168,23 +165,60 @@ class Room:
             )
 
 
+    @classmethod
+    def from_json(cls, name: str, json_room: JSONMap, headless: bool = False):
+        """Loads and renders the assets of a room in different Surface layers
+
+        The colliders are loaded from the file of the room in the rooms folder
+        and shared with the other rooms with the same name, only the enemies
+        belong to this room alone
+
+        Args:
+            name (str): the room name
+            json_room (JSONMap): the room formated json attributes
+            headless (bool, optional): skip the textures and the block layer rendering. Defaults to False.
+
+        Raises:
+            MapFormat: In case the room file is not in the correct format
+            MissingProperty: If an object doesn't include a required property
+
+        Returns:
+            Room: The rendered room
+        """
+        logging.info("Loading '%s' room", name)
 
-        # create colliders and guarantee that they have the friction attribute
-        for json_collider in json_room["layers"][5]["objects"]:
+        room = cls(name, headless)
 
-            if json_collider["properties"][0]["name"] != "friction":
-                logging.fatal("Property at collider missing: 'friction'")
-                raise MissingProperty("Property at collider missing: 'friction'")
+        # check amount of layers
+        if len(json_room["layers"]) != len(LAYER_NAMES):
+            logging.fatal(
+                "Map file '%s' is in the wrong format. %s layers",
+                name,
+                len(json_room["layers"]) - len(LAYER_NAMES),
+            )
+            raise MapFormat(
+                f"Map file '{name}' is in the wrong format. {len(json_room['layers']) - len(LAYER_NAMES)} layers"
+            )
 
-            # create a collider with the read properties
-            collider = Collider(
-                    (json_collider["x"], json_collider["y"]),
-                    (json_collider["width"], json_collider["height"]),
-                    json_collider["properties"][0]["value"],
+        # check if a layer name is different or out of order
+        for i, layer in enumerate(json_room["layers"]):
+            if layer["name"] != LAYER_NAMES[i]:
+                logging.fatal(
+                    "Map file '%s' is in the wrong format. Layer '%s'",
+                    name,
+                    layer["name"],
                 )
+                raise MapFormat(
+                    f"Map file '{name}' is in the wrong format. Layer {layer['name']}"
+                )
+
+        # render the textures of the room
+        if not headless:
+            room.render_block_layer(json_room)
+
 
-            # add the collider to the room
-            room.colliders.append(collider)
+        # the colliders never change so the rooms loaded from the same file share them
+        room.colliders, room.collider_grid = load_geometry(name)
 
 
         # creating POIs
@@ -210,3 +244,48 @@ class Room:
 
         logging.info("Room loaded successfully")
         return room
+
+
+@lru_cache(maxsize=None)
+def load_geometry(name: str) -> Tuple[List[Collider], ColliderGrid]:
+    """Loads the colliders of a room file and indexes them in a grid
+
+    The result is cached so every map that uses the room shares the same
+    colliders, which a server loads once before forking its workers
+
+    Args:
+        name (str): the room name
+
+    Raises:
+        MissingProperty: If a collider doesn't include the friction property
+
+    Returns:
+        Tuple[List[Collider], ColliderGrid]: the colliders of the room and their grid
+    """
+    json_room: JSONMap = load_json(join(MAPS["rooms_folder"], f"{name}.json"))
+    colliders: List[Collider] = list()
+
+    # create colliders and guarantee that they have the friction attribute
+    for json_collider in json_room["layers"][5]["objects"]:
+
+        if json_collider["properties"][0]["name"] != "friction":
+            logging.fatal("Property at collider missing: 'friction'")
+            raise MissingProperty("Property at collider missing: 'friction'")
+
+        # create a collider with the read properties
+        collider = Collider(
+                (json_collider["x"], json_collider["y"]),
+                (json_collider["width"], json_collider["height"]),
+                json_collider["properties"][0]["value"],
+            )
+
+        # add the collider to the room
+        colliders.append(collider)
+
+    # tilesets export a rectangle per tile, fewer colliders make every collision query cheaper
+    if MAPS["merge_colliders"]:
+        merged_colliders = merge_colliders(colliders)
+        logging.info("Merged %s colliders into %s", len(colliders), len(merged_colliders))
+        colliders = merged_colliders
+
+    return colliders, ColliderGrid(colliders)
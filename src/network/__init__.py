@@ -0,0 +1,11 @@
+from .snapshot import EntityState, encode_snapshot, decode_snapshot, entity_state, apply_entity_state
+from .delta import DeltaEncoder, DeltaDecoder
+from .prediction import PlayerPredictor
+from .protocol import pack_input, unpack_input
+from .match import Match, ClientSession
+from .match_server import MatchServer
+from .supervisor import Supervisor
+from .interest import ClientInterest, decode_interest
+from .inputs import InputStream, decode_inputs
+from .loopback import LinkConditions, LoopbackLink
+from .bot import BotClient, open_udp
@@ -0,0 +1,258 @@
+import asyncio
+import logging
+from functools import partial
+from random import Random
+from typing import Awaitable, Callable, List, Optional
+
+from config import NETWORK
+from simulation import Simulation, IDLE_INPUT
+from utils import PlayerInput
+
+from .delta import DeltaDecoder
+from .inputs import InputStream
+from .interest import decode_interest
+from .prediction import PlayerPredictor
+from .protocol import (
+    Address,
+    JOIN,
+    WELCOME,
+    SNAPSHOT,
+    REDIRECT,
+    INTEREST,
+    MESSAGE_KIND,
+    WELCOME_MESSAGE,
+    SNAPSHOT_MESSAGE,
+    REDIRECT_MESSAGE,
+    NO_TICK,
+    NO_SEQUENCE,
+)
+
+
+class BotClient:
+    """A client that plays with random inputs
+
+    It runs the same client side netcode as a player, predicting its own
+    movement and decoding the snapshots into a local simulation, and measures
+    the prediction error of every snapshot it receives
+
+    A supervisor answers the join with the port of the worker that will host
+    the bot, the bot then connects to that worker and joins it instead
+    """
+
+    def __init__(self, send: Callable[[bytes], None], random: Random, connect: Optional[Callable[[int], Awaitable[Callable[[bytes], None]]]] = None) -> None:
+        """Constructor of the class BotClient
+
+        Args:
+            send (Callable[[bytes], None]): sends a message to the server
+            random (Random): the random generator of the inputs
+            connect (Callable[[int], Awaitable[Callable[[bytes], None]]], optional): connects to a port
+            of the server and returns the function that sends messages to it, needed to follow
+            the redirects of a supervisor. Defaults to None.
+        """
+        self.send = send
+        self.random = random
+        self.connect = connect
+
+        self.simulation = Simulation()
+        self.entity_id: Optional[int] = None
+        self.predictor: Optional[PlayerPredictor] = None
+        self.welcomed = asyncio.Event()
+
+        # set by a welcome or a redirect so the bot doesn't wait for the next join attempt
+        self.join_answered = asyncio.Event()
+
+        # the port of the worker that the bot was redirected to
+        self.port: Optional[int] = None
+        self.redirect_port: Optional[int] = None
+
+        # set by the first snapshot, the match is waiting for players until then
+        self.playing = asyncio.Event()
+
+        self.decoder = DeltaDecoder()
+        self.stream = InputStream()
+
+        self.player_input: PlayerInput = IDLE_INPUT
+
+        # distance between the predicted and the authoritative position of each snapshot (pixels)
+        self.prediction_errors: List[float] = list()
+        self.snapshots_received: int = 0
+
+
+    def handle_message(self, data: bytes):
+        """Handles a message received from the server
+
+        Args:
+            data (bytes): the message
+        """
+        kind, = MESSAGE_KIND.unpack_from(data)
+
+        if kind == WELCOME:
+            _, _, entity_id = WELCOME_MESSAGE.unpack_from(data)
+            if entity_id != self.entity_id:
+                self._spawn(entity_id)
+            return
+
+        if kind == REDIRECT:
+            _, port = REDIRECT_MESSAGE.unpack_from(data)
+            self._redirect(port)
+            return
+
+        offset = 0
+        if kind == INTEREST:
+            _, _, offset = decode_interest(data)
+            kind, = MESSAGE_KIND.unpack_from(data, offset)
+
+        if kind == SNAPSHOT and self.predictor is not None:
+            self._receive_snapshot(data, offset)
+
+
+    def _spawn(self, entity_id: int):
+        """Starts predicting the player that the server assigned to the bot
+
+        Args:
+            entity_id (int): the id of the player on the server
+        """
+        self.entity_id = entity_id
+        self.predictor = PlayerPredictor(self.simulation, self.simulation.add_player())
+
+        self.decoder = DeltaDecoder()
+        self.stream = InputStream()
+
+        self.welcomed.set()
+        self.join_answered.set()
+
+
+    def _redirect(self, port: int):
+        """Sends the next join attempt to the worker that the supervisor chose
+
+        Args:
+            port (int): the port of the worker
+        """
+        # the answers to the join attempts sent before the first redirect arrived
+        if self.welcomed.is_set() or port == self.port:
+            return
+
+        if self.connect is None:
+            logging.error("Redirected to port %s without a way to connect to it", port)
+            return
+
+        self.redirect_port = port
+        self.join_answered.set()
+
+
+    def _receive_snapshot(self, data: bytes, offset: int):
+        """Decodes a snapshot into the local simulation and reconciles the prediction
+
+        Args:
+            data (bytes): the message
+            offset (int): the position of the snapshot in the message
+        """
+        _, sequence = SNAPSHOT_MESSAGE.unpack_from(data, offset)
+
+        # the local player is only moved by the prediction
+        entities = {
+            entity_id: entity for entity_id, entity in self.simulation.entities.items()
+            if entity is not self.predictor.player
+        }
+
+        tick = self.decoder.decode(memoryview(data)[offset + SNAPSHOT_MESSAGE.size:], entities)
+        if tick is None:
+            return
+
+        self.snapshots_received += 1
+        self.playing.set()
+
+        state = self.decoder.history[tick].get(self.entity_id)
+        if state is None or sequence == NO_SEQUENCE:
+            return
+
+        self.stream.acknowledge(sequence)
+        self.prediction_errors.append(self.predictor.reconcile(state, sequence))
+
+
+    def _next_input(self) -> PlayerInput:
+        """Changes the keys held by the bot once in a while
+
+        Returns:
+            PlayerInput: the input of the tick
+        """
+        if self.random.random() < 0.1:
+            direction = self.random.choice(("left", "right", None))
+            self.player_input = {
+                "movement": {"left": direction == "left", "right": direction == "right", "jump": self.random.random() < 0.2},
+                "attack": {"attack": self.random.random() < 0.2, "guard": False},
+            }
+
+        return self.player_input
+
+
+    def tick(self):
+        """Predicts the next input and sends it with the ones the server didn't acknowledge
+        """
+        player_input = self._next_input()
+
+        self.predictor.predict(player_input)
+        self.stream.push(player_input)
+
+        acknowledged_tick = self.decoder.last_tick if self.decoder.last_tick is not None else NO_TICK
+        self.send(self.stream.encode(acknowledged_tick))
+
+
+    async def run(self):
+        """Joins a match and plays at the simulation's tick rate until cancelled
+        """
+        loop = asyncio.get_running_loop()
+
+        while not self.welcomed.is_set():
+            if self.redirect_port is not None:
+                self.port = self.redirect_port
+                self.redirect_port = None
+                self.send = await self.connect(self.port)
+
+            self.join_answered.clear()
+            self.send(MESSAGE_KIND.pack(JOIN))
+            try:
+                await asyncio.wait_for(self.join_answered.wait(), NETWORK["join_retry_interval"])
+            except asyncio.TimeoutError:
+                pass
+
+        await self.playing.wait()
+
+        next_tick = loop.time()
+        while True:
+            self.tick()
+
+            next_tick += self.simulation.tick_interval
+            await asyncio.sleep(max(next_tick - loop.time(), 0))
+
+
+
+class UDPClientProtocol(asyncio.DatagramProtocol):
+    """Forwards the datagrams received from a server to a client
+    """
+
+    def __init__(self, receive: Callable[[bytes], None]) -> None:
+        self.receive = receive
+
+
+    def datagram_received(self, data: bytes, addr: Address):
+        self.receive(data)
+
+
+async def open_udp(host: str, port: int, receive: Callable[[bytes], None]) -> Callable[[bytes], None]:
+    """Opens a UDP socket to a server
+
+    Args:
+        host (str): the address of the server
+        port (int): the port of the server
+        receive (Callable[[bytes], None]): called with each datagram of the server
+
+    Returns:
+        Callable[[bytes], None]: sends a datagram to the server
+    """
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        partial(UDPClientProtocol, receive),
+        remote_addr=(host, port)
+    )
+
+    return transport.sendto
@@ -0,0 +1,216 @@
+from functools import lru_cache
+from struct import Struct
+from typing import Dict, Optional, Sequence, Union
+
+from config import NETWORK
+from entities import SkeletonAnimated
+
+from .snapshot import EntityState, entity_state, apply_entity_state, pack_snapshot, unpack_snapshot
+
+
+FULL_SNAPSHOT = 0
+DELTA_SNAPSHOT = 1
+
+PACKET_KIND = Struct("<B")
+
+# tick, baseline tick, number of changed entities, number of removed entities
+DELTA_HEADER = Struct("<IIHH")
+REMOVED_ENTITY = Struct("<H")
+
+# struct formats of each field of an EntityState except for the id
+FIELD_FORMATS = "hhhhBBBBBBB"
+ALL_FIELDS = (1 << len(FIELD_FORMATS)) - 1
+
+SNAPSHOT_HISTORY: int = NETWORK["snapshot_history"]
+
+EntityStates = Dict[int, EntityState]
+
+
+@lru_cache(maxsize=None)
+def _delta_struct(mask: int) -> Struct:
+    """Returns the struct of a delta entry that holds the fields in the given mask
+
+    Args:
+        mask (int): the bitmask of the changed fields
+
+    Returns:
+        Struct: the entity id, the mask and the changed fields
+    """
+    return Struct("<HH" + "".join(fmt for bit, fmt in enumerate(FIELD_FORMATS) if mask & (1 << bit)))
+
+
+def _changed_fields(state: EntityState, baseline: EntityState) -> int:
+    """Returns a bitmask of the fields that changed from the baseline
+
+    Args:
+        state (EntityState): the current state
+        baseline (EntityState): the acknowledged state
+
+    Returns:
+        int: the changed fields bitmask
+    """
+    mask = 0
+    for bit in range(len(FIELD_FORMATS)):
+        if state[bit + 1] != baseline[bit + 1]:
+            mask |= 1 << bit
+
+    return mask
+
+
+class DeltaEncoder:
+    """Encodes the snapshots sent to one client
+
+    Each snapshot only holds the fields that changed since the last
+    snapshot the client acknowledged, if that baseline is no longer known
+    a full snapshot is sent instead
+    """
+
+    def __init__(self) -> None:
+        self.history: Dict[int, EntityStates] = dict()
+        self.acknowledged_tick: Optional[int] = None
+
+
+    def acknowledge(self, tick: int):
+        """Registers that the client received the snapshot of a tick
+
+        Args:
+            tick (int): the acknowledged tick
+        """
+        if tick not in self.history:
+            return
+
+        if self.acknowledged_tick is None or tick > self.acknowledged_tick:
+            self.acknowledged_tick = tick
+
+
+    def encode(self, tick: int, entities: Sequence[SkeletonAnimated]) -> bytes:
+        """Encodes the snapshot of the given entities
+
+        Args:
+            tick (int): the simulation tick
+            entities (Sequence[SkeletonAnimated]): the entities replicated to the client
+
+        Returns:
+            bytes: the encoded packet
+        """
+        return self.encode_states(tick, {entity.entity_id: entity_state(entity) for entity in entities})
+
+
+    def encode_states(self, tick: int, states: EntityStates) -> bytes:
+        """Encodes the snapshot of the given entity states
+
+        Args:
+            tick (int): the simulation tick
+            states (EntityStates): the states replicated to the client indexed by the entity id
+
+        Returns:
+            bytes: the encoded packet
+        """
+        self.history[tick] = states
+        for old_tick in [old_tick for old_tick in self.history if old_tick <= tick - SNAPSHOT_HISTORY]:
+            del self.history[old_tick]
+
+        baseline = self.history.get(self.acknowledged_tick)
+
+        # the client didn't acknowledge any snapshot that is still known
+        if baseline is None:
+            self.acknowledged_tick = None
+            return PACKET_KIND.pack(FULL_SNAPSHOT) + pack_snapshot(tick, list(states.values()))
+
+        entries = list()
+        for entity_id, state in states.items():
+            baseline_state = baseline.get(entity_id)
+
+            mask = ALL_FIELDS if baseline_state is None else _changed_fields(state, baseline_state)
+            if mask == 0:
+                continue
+
+            entries.append(
+                _delta_struct(mask).pack(
+                    entity_id,
+                    mask,
+                    *(field for bit, field in enumerate(state[1:]) if mask & (1 << bit))
+                )
+            )
+
+        removed = [entity_id for entity_id in baseline if entity_id not in states]
+
+        return b"".join((
+            PACKET_KIND.pack(DELTA_SNAPSHOT),
+            DELTA_HEADER.pack(tick, self.acknowledged_tick, len(entries), len(removed)),
+            *entries,
+            *(REMOVED_ENTITY.pack(entity_id) for entity_id in removed),
+        ))
+
+
+
+class DeltaDecoder:
+    """Decodes the snapshots received by a client and keeps the
+    received states so that the next deltas can be applied to them
+    """
+
+    def __init__(self) -> None:
+        self.history: Dict[int, EntityStates] = dict()
+        self.last_tick: Optional[int] = None
+
+
+    def decode(self, packet: Union[bytes, bytearray, memoryview], entities: Dict[int, SkeletonAnimated]) -> Optional[int]:
+        """Decodes a packet into the existing entities
+
+        Args:
+            packet (Union[bytes, bytearray, memoryview]): the encoded packet
+            entities (Dict[int, SkeletonAnimated]): the entities indexed by their id
+
+        Returns:
+            Optional[int]: the tick to acknowledge or None if the packet
+            couldn't be decoded because its baseline is unknown or it is out of date
+        """
+        view = memoryview(packet)
+        kind, = PACKET_KIND.unpack_from(view)
+
+        if kind == FULL_SNAPSHOT:
+            tick, unpacked_states = unpack_snapshot(view[PACKET_KIND.size:])
+            if self.last_tick is not None and tick <= self.last_tick:
+                return None
+
+            states: EntityStates = {state[0]: state for state in unpacked_states}
+
+        else:
+            tick, baseline_tick, num_changed, num_removed = DELTA_HEADER.unpack_from(view, PACKET_KIND.size)
+            if (self.last_tick is not None and tick <= self.last_tick) or baseline_tick not in self.history:
+                return None
+
+            states = dict(self.history[baseline_tick])
+
+            offset = PACKET_KIND.size + DELTA_HEADER.size
+            for _ in range(num_changed):
+                entity_id, mask = _delta_struct(0).unpack_from(view, offset)
+                entry = _delta_struct(mask)
+                fields = iter(entry.unpack_from(view, offset)[2:])
+                offset += entry.size
+
+                baseline_state = states.get(entity_id)
+                states[entity_id] = (entity_id,) + tuple(
+                    next(fields) if mask & (1 << bit) else baseline_state[bit + 1]
+                    for bit in range(len(FIELD_FORMATS))
+                )
+
+            for _ in range(num_removed):
+                entity_id, = REMOVED_ENTITY.unpack_from(view, offset)
+                offset += REMOVED_ENTITY.size
+                states.pop(entity_id, None)
+
+        baseline = self.history.get(self.last_tick, dict())
+
+        self.history[tick] = states
+        for old_tick in [old_tick for old_tick in self.history if old_tick <= tick - SNAPSHOT_HISTORY]:
+            del self.history[old_tick]
+        self.last_tick = tick
+
+        # only the states that changed since the last snapshot need to be written
+        for entity_id, state in states.items():
+            entity = entities.get(entity_id)
+            if entity is not None and baseline.get(entity_id) != state:
+                apply_entity_state(entity, state)
+
+        return tick
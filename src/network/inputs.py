@@ -0,0 +1,98 @@
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from config import INPUT
+from utils import PlayerInput
+
+from .protocol import INPUT as INPUT_KIND, INPUT_MESSAGE, INPUT_BITS, NO_TICK, pack_input
+
+
+BITS_PER_INPUT = len(INPUT_BITS)
+INPUT_MASK = (1 << BITS_PER_INPUT) - 1
+
+
+class InputStream:
+    """Sends the inputs of a client with redundancy
+
+    Every packet carries the newest input and the previous ones that the
+    server didn't acknowledge yet, so a lost packet is recovered by the
+    next one instead of being retransmitted
+    """
+
+    def __init__(self, redundancy: int = INPUT["input_redundancy"]) -> None:
+        """Constructor of the class InputStream
+
+        Args:
+            redundancy (int, optional): the maximum number of inputs in a packet. Defaults to INPUT["input_redundancy"].
+        """
+        # packed inputs, the newest one is on the left
+        self.inputs: Deque[int] = deque(maxlen=redundancy)
+        self.sequence: int = -1
+
+
+    def push(self, player_input: PlayerInput) -> int:
+        """Adds the input of a new tick to the stream
+
+        Args:
+            player_input (PlayerInput): the input
+
+        Returns:
+            int: the sequence number of the input
+        """
+        self.sequence += 1
+        self.inputs.appendleft(pack_input(player_input))
+
+        return self.sequence
+
+
+    def acknowledge(self, sequence: int):
+        """Stops sending the inputs that the server already processed
+
+        Args:
+            sequence (int): the sequence of the last input processed by the server
+        """
+        while len(self.inputs) > 1 and self.sequence - len(self.inputs) + 1 <= sequence:
+            self.inputs.pop()
+
+
+    def encode(self, acknowledged_tick: int = NO_TICK) -> bytes:
+        """Encodes the pending inputs into a packet
+
+        Args:
+            acknowledged_tick (int, optional): the last snapshot tick received. Defaults to NO_TICK.
+
+        Returns:
+            bytes: the packet
+        """
+        packed = 0
+        for index, bits in enumerate(self.inputs):
+            packed |= bits << (index * BITS_PER_INPUT)
+
+        return INPUT_MESSAGE.pack(INPUT_KIND, acknowledged_tick, self.sequence, len(self.inputs)) + packed.to_bytes(
+            (len(self.inputs) * BITS_PER_INPUT + 7) // 8, "little"
+        )
+
+
+def decode_inputs(message: bytes) -> Optional[Tuple[int, int, List[int]]]:
+    """Decodes an input packet
+
+    Args:
+        message (bytes): the packet
+
+    Returns:
+        Optional[Tuple[int, int, List[int]]]: the acknowledged snapshot tick, the sequence
+        of the newest input and the packed inputs from the newest to the oldest,
+        or None if the packet is shorter than the inputs it declares
+    """
+    if len(message) < INPUT_MESSAGE.size:
+        return None
+
+    _, acknowledged_tick, sequence, count = INPUT_MESSAGE.unpack_from(message)
+
+    size = (count * BITS_PER_INPUT + 7) // 8
+    if len(message) < INPUT_MESSAGE.size + size:
+        return None
+
+    packed = int.from_bytes(message[INPUT_MESSAGE.size:INPUT_MESSAGE.size + size], "little")
+
+    return acknowledged_tick, sequence, [(packed >> (index * BITS_PER_INPUT)) & INPUT_MASK for index in range(count)]
@@ -0,0 +1,149 @@
+from struct import Struct
+from typing import Dict, List, Optional, Tuple
+
+from simulation import Simulation, RoomCoords
+
+from .protocol import INTEREST
+
+
+# kind, number of entities that entered, number of entities that left
+# the message is sent in the same packet as a snapshot, right before it
+INTEREST_MESSAGE = Struct("<BHH")
+
+# entity id, room coordinates
+ENTERED_ENTITY = Struct("<Hbb")
+LEFT_ENTITY = Struct("<H")
+
+# the current room and the ones next to it
+NEIGHBOUR_OFFSETS = ((0, 0), (-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def interest_rooms(simulation: Simulation, room_coords: RoomCoords) -> List[RoomCoords]:
+    """Returns the rooms that are replicated to a client in the given room
+
+    Args:
+        simulation (Simulation): the simulation
+        room_coords (RoomCoords): the room of the client's player
+
+    Returns:
+        List[RoomCoords]: the room and its existing neighbours
+    """
+    rooms = list()
+
+    for offset_x, offset_y in NEIGHBOUR_OFFSETS:
+        coords = (room_coords[0] + offset_x, room_coords[1] + offset_y)
+        if simulation.map.get_room(coords) is not None:
+            rooms.append(coords)
+
+    return rooms
+
+
+def entities_of_interest(simulation: Simulation, room_coords: RoomCoords) -> Dict[int, RoomCoords]:
+    """Returns the entities that are replicated to a client in the given room
+
+    Args:
+        simulation (Simulation): the simulation
+        room_coords (RoomCoords): the room of the client's player
+
+    Returns:
+        Dict[int, RoomCoords]: the room of each entity indexed by the entity id
+    """
+    return {
+        entity.entity_id: coords
+        for coords in interest_rooms(simulation, room_coords)
+        for entity in simulation.room_entities(coords)
+    }
+
+
+
+class ClientInterest:
+    """Keeps the set of entities replicated to a client
+
+    The entities that enter or leave the set generate events that are
+    sent to the client in front of every snapshot until it acknowledges
+    a snapshot that carried them
+    """
+
+    def __init__(self) -> None:
+        self.entities: Dict[int, RoomCoords] = dict()
+
+        # pending events and the tick they happened on
+        self.entered: Dict[int, Tuple[RoomCoords, int]] = dict()
+        self.left: Dict[int, int] = dict()
+
+
+    def update(self, tick: int, entities: Dict[int, RoomCoords]):
+        """Replaces the set of replicated entities and registers the changes as events,
+        an entity that changed rooms enters again with its new room
+
+        Args:
+            tick (int): the simulation tick
+            entities (Dict[int, RoomCoords]): the room of each entity indexed by the entity id
+        """
+        for entity_id, coords in entities.items():
+            if self.entities.get(entity_id) != coords:
+                self.entered[entity_id] = (coords, tick)
+                self.left.pop(entity_id, None)
+
+        for entity_id in self.entities:
+            if entity_id not in entities:
+                self.left[entity_id] = tick
+                self.entered.pop(entity_id, None)
+
+        self.entities = entities
+
+
+    def acknowledge(self, tick: int):
+        """Drops the events that the client already received
+
+        Args:
+            tick (int): the last snapshot tick that the client received
+        """
+        for entity_id in [entity_id for entity_id, (_, event_tick) in self.entered.items() if event_tick <= tick]:
+            del self.entered[entity_id]
+
+        for entity_id in [entity_id for entity_id, event_tick in self.left.items() if event_tick <= tick]:
+            del self.left[entity_id]
+
+
+    def encode(self) -> Optional[bytes]:
+        """Encodes the pending events
+
+        Returns:
+            Optional[bytes]: the message or None if there are no pending events
+        """
+        if not (self.entered or self.left):
+            return None
+
+        return b"".join((
+            INTEREST_MESSAGE.pack(INTEREST, len(self.entered), len(self.left)),
+            *(ENTERED_ENTITY.pack(entity_id, *coords) for entity_id, (coords, _) in self.entered.items()),
+            *(LEFT_ENTITY.pack(entity_id) for entity_id in self.left),
+        ))
+
+
+def decode_interest(message: bytes) -> Tuple[Dict[int, RoomCoords], List[int], int]:
+    """Decodes the interest events received by a client
+
+    Args:
+        message (bytes): the message
+
+    Returns:
+        Tuple[Dict[int, RoomCoords], List[int], int]: the room of the entities that entered,
+        the ids of the entities that left and the size of the message
+    """
+    _, num_entered, num_left = INTEREST_MESSAGE.unpack_from(message)
+    offset = INTEREST_MESSAGE.size
+
+    entered = dict()
+    for _ in range(num_entered):
+        entity_id, room_x, room_y = ENTERED_ENTITY.unpack_from(message, offset)
+        offset += ENTERED_ENTITY.size
+        entered[entity_id] = (room_x, room_y)
+
+    left = list()
+    for _ in range(num_left):
+        left.append(LEFT_ENTITY.unpack_from(message, offset)[0])
+        offset += LEFT_ENTITY.size
+
+    return entered, left, offset
@@ -0,0 +1,59 @@
+import asyncio
+from random import Random
+from typing import Callable, TypedDict
+
+
+class LinkConditions(TypedDict):
+    latency: float
+    jitter: float
+    loss: float
+    reorder: float
+
+
+class LoopbackLink:
+    """One direction of an in-process connection that behaves like a network
+
+    The datagrams are delivered on the event loop after the latency plus
+    a random jitter, some of them are dropped and some are held back
+    so that the next ones overtake them. The random generator is seeded
+    so that the same conditions drop and delay the same datagrams
+    """
+
+    def __init__(self, receive: Callable[[bytes], None], conditions: LinkConditions, random: Random) -> None:
+        """Constructor of the class LoopbackLink
+
+        Args:
+            receive (Callable[[bytes], None]): called with each delivered datagram
+            conditions (LinkConditions): the latency and jitter in seconds and the loss and reorder probabilities
+            random (Random): the random generator of the link
+        """
+        self.receive = receive
+        self.conditions = conditions
+        self.random = random
+
+        self.packets_sent: int = 0
+        self.packets_lost: int = 0
+        self.bytes_sent: int = 0
+
+
+    def send(self, data: bytes):
+        """Sends a datagram through the link
+
+        Args:
+            data (bytes): the datagram
+        """
+        self.packets_sent += 1
+        self.bytes_sent += len(data)
+
+        if self.random.random() < self.conditions["loss"]:
+            self.packets_lost += 1
+            return
+
+        delay = self.conditions["latency"] + self.random.uniform(-self.conditions["jitter"], self.conditions["jitter"])
+
+        # a reordered datagram takes twice as long so the next ones arrive first
+        if self.random.random() < self.conditions["reorder"]:
+            delay += self.conditions["latency"]
+
+        # the sender may reuse its buffer
+        asyncio.get_running_loop().call_later(max(delay, 0), self.receive, bytes(data))
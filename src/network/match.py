@@ -0,0 +1,281 @@
+import asyncio
+import logging
+from collections import deque
+from time import monotonic, perf_counter
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from config import INPUT, SERVER
+from entities import Player
+from simulation import Simulation, IDLE_INPUT, RoomCoords, player_room
+from utils import PlayerInput
+
+from .delta import DeltaEncoder
+from .interest import ClientInterest, entities_of_interest
+from .snapshot import EntityState, entity_state
+from .protocol import (
+    Address,
+    WELCOME,
+    SNAPSHOT,
+    WELCOME_MESSAGE,
+    SNAPSHOT_MESSAGE,
+    NO_TICK,
+    NO_SEQUENCE,
+    unpack_input,
+)
+
+
+class ClientSession:
+    """The state of a client connected to a match
+    """
+
+    def __init__(self, address: Address, send: Callable[[bytes], None]) -> None:
+        """Constructor of the class ClientSession
+
+        Args:
+            address (Address): the address of the client
+            send (Callable[[bytes], None]): sends a message to the client
+        """
+        self.address = address
+        self.send = send
+
+        self.player: Player = None
+
+        self.encoder = DeltaEncoder()
+        self.interest = ClientInterest()
+
+        # inputs waiting to be simulated, each one with the snapshot tick the client was seeing when it sent it
+        self.inputs: Deque[Tuple[int, PlayerInput, int]] = deque()
+
+        # the oldest inputs are dropped when the client sends them faster than the tick rate,
+        # a packet can recover as many lost inputs as the redundancy so they must fit
+        self.max_inputs: int = max(INPUT["input_buffer_max_len"], INPUT["input_redundancy"])
+        self.last_received_sequence: int = -1
+        self.last_processed_sequence: int = -1
+        self.last_input: PlayerInput = IDLE_INPUT
+        self.view_tick: int = NO_TICK
+
+        self.last_message_time = monotonic()
+
+
+    def receive_inputs(self, acknowledged_tick: int, sequence: int, inputs: List[int]):
+        """Queues the inputs of the client that weren't received yet
+
+        Args:
+            acknowledged_tick (int): the last snapshot tick that the client received
+            sequence (int): the sequence number of the newest input
+            inputs (List[int]): the packed inputs from the newest to the oldest
+        """
+        self.last_message_time = monotonic()
+
+        if acknowledged_tick != NO_TICK:
+            self.encoder.acknowledge(acknowledged_tick)
+            self.interest.acknowledge(acknowledged_tick)
+
+        # the inputs before the last received one are duplicates
+        for index in range(min(len(inputs), sequence - self.last_received_sequence) - 1, -1, -1):
+            self.inputs.append((sequence - index, unpack_input(inputs[index]), acknowledged_tick))
+
+        while len(self.inputs) > self.max_inputs:
+            self.inputs.popleft()
+
+        self.last_received_sequence = max(self.last_received_sequence, sequence)
+
+
+    def next_input(self) -> PlayerInput:
+        """Returns the input to simulate on this tick, the last input
+        is repeated when there are none waiting
+
+        Returns:
+            PlayerInput: the input
+        """
+        if self.inputs:
+            self.last_processed_sequence, self.last_input, self.view_tick = self.inputs.popleft()
+
+        return self.last_input
+
+
+
+class Match:
+    """A match between players that runs its own simulation
+
+    The match starts when it is full and ends when a player leaves,
+    there are no rounds until the players have a way to win one
+    """
+
+    def __init__(self, match_id: int, players_per_match: int = SERVER["players_per_match"]) -> None:
+        """Constructor of the class Match
+
+        Args:
+            match_id (int): the id of the match
+            players_per_match (int, optional): the number of players needed to start. Defaults to SERVER["players_per_match"].
+        """
+        self.match_id = match_id
+        self.players_per_match = players_per_match
+
+        self.simulation = Simulation(lag_compensation=True)
+
+        self.clients: Dict[Address, ClientSession] = dict()
+
+        self.is_running: bool = True
+
+        # moving average of the time it takes to run a tick (seconds)
+        self.tick_time: float = 0
+        self.tick_times: Deque[float] = deque(maxlen=SERVER["tick_time_samples"])
+
+        self.task: Optional[asyncio.Task] = None
+
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.clients) >= self.players_per_match
+
+
+    def add_client(self, address: Address, send: Callable[[bytes], None]) -> ClientSession:
+        """Adds a client to the match and spawns its player
+
+        Args:
+            address (Address): the address of the client
+            send (Callable[[bytes], None]): sends a message to the client
+
+        Returns:
+            ClientSession: the session of the client
+        """
+        client = ClientSession(address, send)
+        self.clients[address] = client
+
+        self._spawn(client)
+        self.update_interest()
+
+        return client
+
+
+    def remove_client(self, address: Address):
+        """Removes a client from the match, the match ends
+        when there aren't enough players to continue
+
+        Args:
+            address (Address): the address of the client
+        """
+        client = self.clients.pop(address, None)
+        if client is None:
+            return
+
+        self.simulation.remove_player(client.player.entity_id)
+        self.update_interest()
+
+        if self.task is not None:
+            self.is_running = False
+
+
+    def _spawn(self, client: ClientSession):
+        """Spawns the player of a client and tells the client which entity it controls
+
+        Args:
+            client (ClientSession): the session of the client
+        """
+        client.player = self.simulation.add_player()
+        self.welcome(client)
+
+
+    def welcome(self, client: ClientSession):
+        """Tells a client which entity it controls
+
+        Args:
+            client (ClientSession): the session of the client
+        """
+        client.send(WELCOME_MESSAGE.pack(WELCOME, self.match_id, client.player.entity_id))
+
+
+    def tick(self):
+        """Simulates one tick with the clients' inputs and sends
+        each client its snapshot
+        """
+        now = monotonic()
+        for address in [address for address, client in self.clients.items() if now - client.last_message_time > SERVER["client_timeout"]]:
+            logging.info("Client %s timed out", address)
+            self.remove_client(address)
+
+        self.simulation.step(
+            {client.player.entity_id: client.next_input() for client in self.clients.values()},
+            {client.player.entity_id: client.view_tick for client in self.clients.values() if client.view_tick != NO_TICK}
+        )
+
+        # the replicated entities only change when a player changes rooms
+        if self.simulation.room_transitions:
+            self.update_interest()
+
+        # the state of each entity is computed once and shared by every client that replicates it
+        states: Dict[int, EntityState] = dict()
+
+        for client in self.clients.values():
+            for entity_id in client.interest.entities:
+                if entity_id not in states:
+                    states[entity_id] = entity_state(self.simulation.entities[entity_id])
+
+            sequence = client.last_processed_sequence if client.last_processed_sequence > -1 else NO_SEQUENCE
+
+            interest_events = client.interest.encode()
+
+            client.send(
+                (interest_events or b"") +
+                SNAPSHOT_MESSAGE.pack(SNAPSHOT, sequence) +
+                client.encoder.encode_states(
+                    self.simulation.tick,
+                    {entity_id: states[entity_id] for entity_id in client.interest.entities}
+                )
+            )
+
+
+    def update_interest(self):
+        """Updates the entities replicated to each client, the players get the entities
+        in their current room and in the rooms next to it
+        """
+        entities_by_room: Dict[RoomCoords, Dict[int, RoomCoords]] = dict()
+
+        for client in self.clients.values():
+            room = player_room(client.player)
+
+            if room not in entities_by_room:
+                entities_by_room[room] = entities_of_interest(self.simulation, room)
+
+            client.interest.update(self.simulation.tick, entities_by_room[room])
+
+
+    async def run(self):
+        """Ticks the match at the simulation's tick rate until it ends
+        """
+        logging.info("Match %s started with %s players", self.match_id, len(self.clients))
+
+        loop = asyncio.get_running_loop()
+
+        next_tick = loop.time()
+        while self.is_running:
+            tick_start = perf_counter()
+            self.tick()
+            elapsed = perf_counter() - tick_start
+
+            self.tick_time += (elapsed - self.tick_time) * SERVER["tick_time_smoothing"]
+            self.tick_times.append(elapsed)
+
+            next_tick += self.simulation.tick_interval
+            delay = next_tick - loop.time()
+
+            if delay < 0:
+                # the tick took too long, restart the schedule instead of rushing the next ticks
+                next_tick = loop.time()
+                delay = 0
+
+            await asyncio.sleep(delay)
+
+        logging.info("Match %s ended", self.match_id)
+
+
+    @property
+    def load(self) -> float:
+        """The fraction of the tick interval spent running the simulation
+        """
+        return self.tick_time / self.simulation.tick_interval
+
+
+    def __repr__(self) -> str:
+        return f"Match(match_id={self.match_id}, players={len(self.clients)})"
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Callable, Dict, Optional, TypedDict
+
+from config import SERVER
+
+from .match import Match
+from .inputs import decode_inputs
+from .protocol import (
+    Address,
+    JOIN,
+    INPUT,
+    LEAVE,
+    MESSAGE_KIND,
+    FRAME_LENGTH,
+)
+
+
+class ServerMetrics(TypedDict):
+    matches: int
+    players: int
+    load: float
+
+
+class MatchServer:
+    """Hosts many matches on a single event loop
+
+    Clients that join are grouped into a match until it is full,
+    then the match starts ticking as a task of the event loop.
+    The server doesn't depend on the transport, each client
+    is given a callable that sends messages to it
+    """
+
+    def __init__(self) -> None:
+        self.matches: Dict[int, Match] = dict()
+        self.clients: Dict[Address, Match] = dict()
+
+        # match waiting for players
+        self.lobby: Optional[Match] = None
+
+        self._next_match_id: int = 0
+
+
+    def join(self, address: Address, send: Callable[[bytes], None]):
+        """Adds a client to the lobby match and starts it when it's full
+
+        Args:
+            address (Address): the address of the client
+            send (Callable[[bytes], None]): sends a message to the client
+        """
+        # the welcome message got lost and the client is trying again
+        if address in self.clients:
+            client = self.clients[address].clients.get(address)
+            if client is not None:
+                self.clients[address].welcome(client)
+            return
+
+        if self.lobby is None:
+            self.lobby = Match(self._next_match_id)
+            self.matches[self.lobby.match_id] = self.lobby
+            self._next_match_id += 1
+
+        match = self.lobby
+        match.add_client(address, send)
+        self.clients[address] = match
+
+        logging.info("Client %s joined match %s", address, match.match_id)
+
+        if match.is_full:
+            self.lobby = None
+            match.task = asyncio.get_running_loop().create_task(match.run())
+            match.task.add_done_callback(partial(self._match_ended, match))
+
+
+    def leave(self, address: Address):
+        """Removes a client from its match
+
+        Args:
+            address (Address): the address of the client
+        """
+        match = self.clients.pop(address, None)
+        if match is None:
+            return
+
+        match.remove_client(address)
+
+        logging.info("Client %s left match %s", address, match.match_id)
+
+        if match is self.lobby and not match.clients:
+            self.lobby = None
+            del self.matches[match.match_id]
+
+
+    def _match_ended(self, match: Match, task: asyncio.Task):
+        """Removes a finished match and its clients from the server
+
+        Args:
+            match (Match): the match that ended
+            task (asyncio.Task): the task that ran the match
+        """
+        if not task.cancelled() and task.exception() is not None:
+            logging.error("Match %s crashed", match.match_id, exc_info=task.exception())
+
+        for address in list(match.clients):
+            self.clients.pop(address, None)
+
+        self.matches.pop(match.match_id, None)
+
+
+    def metrics(self) -> ServerMetrics:
+        """Returns the load of the server
+
+        Returns:
+            ServerMetrics: the number of matches and players and the sum of the load of the matches
+        """
+        return {
+            "matches": len(self.matches),
+            "players": len(self.clients),
+            "load": sum(match.load for match in self.matches.values()),
+        }
+
+
+    def handle_message(self, address: Address, data: bytes, send: Callable[[bytes], None]):
+        """Handles a message received from a client
+
+        Args:
+            address (Address): the address of the client
+            data (bytes): the message
+            send (Callable[[bytes], None]): sends a message to the client
+        """
+        if not data:
+            return
+
+        kind, = MESSAGE_KIND.unpack_from(data)
+
+        if kind == JOIN:
+            self.join(address, send)
+
+        elif kind == LEAVE:
+            self.leave(address)
+
+        elif kind == INPUT:
+            match = self.clients.get(address)
+            if match is None or address not in match.clients:
+                return
+
+            # a truncated packet is dropped, the next one carries its inputs again
+            inputs = decode_inputs(data)
+            if inputs is not None:
+                match.clients[address].receive_inputs(*inputs)
+
+
+    async def serve_udp(self, host: str = SERVER["host"], port: int = SERVER["port"]) -> asyncio.DatagramTransport:
+        """Starts accepting clients over UDP
+
+        Args:
+            host (str, optional): the address to bind to. Defaults to SERVER["host"].
+            port (int, optional): the port to bind to. Defaults to SERVER["port"].
+
+        Returns:
+            asyncio.DatagramTransport: the transport of the socket
+        """
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            partial(UDPServerProtocol, self),
+            local_addr=(host, port)
+        )
+
+        logging.info("Listening for UDP clients on %s:%s", host, port)
+
+        return transport
+
+
+    async def serve_tcp(self, host: str = SERVER["host"], port: int = SERVER["port"]) -> asyncio.AbstractServer:
+        """Starts accepting clients over TCP
+
+        Args:
+            host (str, optional): the address to bind to. Defaults to SERVER["host"].
+            port (int, optional): the port to bind to. Defaults to SERVER["port"].
+
+        Returns:
+            asyncio.AbstractServer: the TCP server
+        """
+        server = await asyncio.start_server(self._handle_stream, host, port)
+
+        logging.info("Listening for TCP clients on %s:%s", host, port)
+
+        return server
+
+
+    async def _handle_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Reads the length prefixed messages of a TCP client
+
+        Args:
+            reader (asyncio.StreamReader): the stream of the client
+            writer (asyncio.StreamWriter): the stream to the client
+        """
+        address: Address = writer.get_extra_info("peername")[:2]
+
+        def send(data: bytes):
+            writer.write(FRAME_LENGTH.pack(len(data)) + data)
+
+        try:
+            while True:
+                length, = FRAME_LENGTH.unpack(await reader.readexactly(FRAME_LENGTH.size))
+                self.handle_message(address, await reader.readexactly(length), send)
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        finally:
+            self.leave(address)
+            writer.close()
+
+
+
+class UDPServerProtocol(asyncio.DatagramProtocol):
+    """Forwards the datagrams received on a socket to the match server
+    """
+
+    def __init__(self, server: MatchServer) -> None:
+        self.server = server
+        self.transport: asyncio.DatagramTransport = None
+
+
+    def connection_made(self, transport: asyncio.DatagramTransport):
+        self.transport = transport
+
+
+    def datagram_received(self, data: bytes, addr: Address):
+        self.server.handle_message(addr, data, partial(self.transport.sendto, addr=addr))
@@ -0,0 +1,116 @@
+from math import hypot
+from typing import List, Optional
+
+from config import NETWORK
+from entities import Player
+from simulation import Simulation
+from utils import PlayerInput
+
+from .snapshot import POSITION_PRECISION, EntityState, entity_state, apply_entity_state
+
+
+PREDICTION_BUFFER_SIZE: int = NETWORK["prediction_buffer_size"]
+
+
+class PlayerPredictor:
+    """Predicts the movement of the local player
+
+    The inputs are applied as soon as they are read and the predicted states
+    are kept in a ring buffer indexed by the input sequence number.
+    When an authoritative state arrives every input that the server
+    didn't process yet is replayed on top of it
+    """
+
+    def __init__(self, simulation: Simulation, player: Player, size: int = PREDICTION_BUFFER_SIZE) -> None:
+        """Constructor of the class PlayerPredictor
+
+        Args:
+            simulation (Simulation): the local simulation
+            player (Player): the local player
+            size (int, optional): the number of inputs kept in the buffer. Defaults to PREDICTION_BUFFER_SIZE.
+        """
+        self.simulation = simulation
+        self.player = player
+
+        self.size = size
+
+        # ring buffer
+        self.sequences: List[int] = [-1] * size
+        self.inputs: List[Optional[PlayerInput]] = [None] * size
+        self.states: List[Optional[EntityState]] = [None] * size
+
+        self.sequence: int = -1
+
+
+    def _apply_input(self, player_input: PlayerInput):
+        """Runs one tick of the local player with the given input
+
+        Args:
+            player_input (PlayerInput): the input of the tick
+        """
+        room = self.simulation.map.get_room(self.player.current_room)
+
+        self.player.move(player_input["movement"])
+        self.player.attack(player_input["attack"])
+        self.player.update(room.collider_grid)
+
+        self.simulation.navigate(self.player)
+
+
+    def predict(self, player_input: PlayerInput) -> int:
+        """Applies a local input right away and stores the predicted state
+
+        Args:
+            player_input (PlayerInput): the input of the tick
+
+        Returns:
+            int: the sequence number of the input
+        """
+        self._apply_input(player_input)
+
+        self.sequence += 1
+        index = self.sequence % self.size
+
+        self.sequences[index] = self.sequence
+        self.inputs[index] = player_input
+        self.states[index] = entity_state(self.player)
+
+        return self.sequence
+
+
+    def reconcile(self, state: EntityState, sequence: int) -> float:
+        """Corrects the prediction with an authoritative state
+
+        Args:
+            state (EntityState): the authoritative state of the player
+            sequence (int): the sequence number of the last input the server processed
+
+        Returns:
+            float: the distance between the predicted and the authoritative position
+        """
+        index = sequence % self.size
+        predicted = self.states[index] if self.sequences[index] == sequence else None
+
+        if predicted is not None:
+            error = hypot(predicted[1] - state[1], predicted[2] - state[2]) / POSITION_PRECISION
+
+            # the prediction was right, nothing to replay
+            if predicted[1:] == state[1:]:
+                return error
+        else:
+            error = hypot(
+                self.player.pos.x - state[1] / POSITION_PRECISION,
+                self.player.pos.y - state[2] / POSITION_PRECISION
+            )
+
+        apply_entity_state(self.player, state)
+
+        # replay the inputs that the server didn't process yet
+        # the older ones were overwritten and can't be replayed
+        for replayed in range(max(sequence + 1, self.sequence - self.size + 1), self.sequence + 1):
+            index = replayed % self.size
+
+            self._apply_input(self.inputs[index])
+            self.states[index] = entity_state(self.player)
+
+        return error
@@ -0,0 +1,78 @@
+from struct import Struct
+from typing import Tuple
+
+from utils import PlayerInput
+
+
+# message kinds, always the first byte of a message
+JOIN = 0
+WELCOME = 1
+INPUT = 2
+SNAPSHOT = 3
+LEAVE = 4
+REDIRECT = 5
+INTEREST = 6
+
+MESSAGE_KIND = Struct("<B")
+
+# kind, match id, entity id of the player
+WELCOME_MESSAGE = Struct("<BIH")
+
+# kind, acknowledged snapshot tick, sequence of the newest input, number of inputs
+# followed by the inputs packed in a bitfield from the newest to the oldest
+INPUT_MESSAGE = Struct("<BIIB")
+
+# kind, sequence of the last input processed by the server, followed by the snapshot packet
+SNAPSHOT_MESSAGE = Struct("<BI")
+
+# kind, port of the worker that will host the client
+REDIRECT_MESSAGE = Struct("<BH")
+
+# frames of the stream transports are prefixed with their length
+FRAME_LENGTH = Struct("<H")
+
+NO_TICK = 0xFFFFFFFF
+NO_SEQUENCE = 0xFFFFFFFF
+
+Address = Tuple[str, int]
+
+INPUT_BITS = (
+    ("movement", "left"),
+    ("movement", "right"),
+    ("movement", "jump"),
+    ("attack", "attack"),
+    ("attack", "guard"),
+)
+
+
+def pack_input(player_input: PlayerInput) -> int:
+    """Packs the keys of an input into a bitfield
+
+    Args:
+        player_input (PlayerInput): the input
+
+    Returns:
+        int: the bitfield
+    """
+    bits = 0
+    for bit, (group, key) in enumerate(INPUT_BITS):
+        if player_input[group][key]:
+            bits |= 1 << bit
+
+    return bits
+
+
+def unpack_input(bits: int) -> PlayerInput:
+    """Unpacks the keys of an input from a bitfield
+
+    Args:
+        bits (int): the bitfield
+
+    Returns:
+        PlayerInput: the input
+    """
+    player_input: PlayerInput = {"movement": dict(), "attack": dict()}
+    for bit, (group, key) in enumerate(INPUT_BITS):
+        player_input[group][key] = bool(bits & (1 << bit))
+
+    return player_input
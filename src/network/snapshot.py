@@ -0,0 +1,205 @@
+from struct import Struct
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+from config import ANIMATIONS, NETWORK
+from entities import SkeletonAnimated, Player
+
+
+# entity_id, pos.x, pos.y, vel.x, vel.y, flags, animation, keyframe, stun_frames, attack_sequence, room x, room y
+EntityState = Tuple[int, int, int, int, int, int, int, int, int, int, int, int]
+
+SNAPSHOT_HEADER = Struct("<IH")
+ENTITY_STATE = Struct("<HhhhhBBBBBBB")
+
+INT16_MIN = -(1 << 15)
+INT16_MAX = (1 << 15) - 1
+
+POSITION_PRECISION: int = NETWORK["position_precision"]
+
+# the states are packed in a bitfield, the bit of each state is its index
+STATE_FLAGS = (
+    "is_colliding",
+    "is_moving",
+    "is_jumping",
+    "is_grounded",
+    "is_climbing",
+    "is_attacking",
+    "is_stunned",
+)
+DIRECTION_FLAG = 1 << len(STATE_FLAGS)
+
+NO_ANIMATION = 255
+
+# the room coords of the entities that don't track their room
+NO_ROOM = 255
+
+
+def _animation_names(animation_paths: Dict[str, Union[str, dict]]) -> List[str]:
+    """Returns the names of all the animations in the configuration
+    in the order they are declared
+
+    Args:
+        animation_paths (Dict[str, Union[str, dict]]): the nested animation paths
+
+    Returns:
+        List[str]: the animation names
+    """
+    names = list()
+
+    for name, value in animation_paths.items():
+        if isinstance(value, dict):
+            names.extend(_animation_names(value))
+            continue
+        names.append(name)
+
+    return names
+
+
+ANIMATION_NAMES = _animation_names(ANIMATIONS["animation_paths"])
+ANIMATION_IDS = {name: animation_id for animation_id, name in enumerate(ANIMATION_NAMES)}
+
+
+def _quantize(value: float) -> int:
+    """Converts a coordinate to a fixed point integer that fits in 16 bits
+
+    Args:
+        value (float): the coordinate
+
+    Returns:
+        int: the quantized coordinate
+    """
+    return max(INT16_MIN, min(INT16_MAX, round(value * POSITION_PRECISION)))
+
+
+def entity_state(entity: SkeletonAnimated) -> EntityState:
+    """Returns the quantized state of an entity
+
+    Args:
+        entity (SkeletonAnimated): the entity
+
+    Returns:
+        EntityState: the quantized state
+    """
+    flags = DIRECTION_FLAG if entity.direction == -1 else 0
+    for bit, state in enumerate(STATE_FLAGS):
+        if getattr(entity, state):
+            flags |= 1 << bit
+
+    room_x = room_y = NO_ROOM
+    if isinstance(entity, Player):
+        room_x, room_y = int(entity.current_room.x), int(entity.current_room.y)
+
+    return (
+        entity.entity_id,
+        _quantize(entity.pos.x),
+        _quantize(entity.pos.y),
+        _quantize(entity.vel.x),
+        _quantize(entity.vel.y),
+        flags,
+        ANIMATION_IDS.get(entity.current_animation, NO_ANIMATION),
+        entity.current_keyframe,
+        entity.stun_frames,
+        entity.attack_sequence,
+        room_x,
+        room_y,
+    )
+
+
+def apply_entity_state(entity: SkeletonAnimated, state: EntityState):
+    """Writes a quantized state into an existing entity
+
+    Args:
+        entity (SkeletonAnimated): the entity to update
+        state (EntityState): the quantized state
+    """
+    _, pos_x, pos_y, vel_x, vel_y, flags, animation, keyframe, stun_frames, attack_sequence, room_x, room_y = state
+
+    entity.set_pos((pos_x / POSITION_PRECISION, pos_y / POSITION_PRECISION))
+    entity.bounding_box.midbottom = entity.pos
+    entity.vel.update(vel_x / POSITION_PRECISION, vel_y / POSITION_PRECISION)
+
+    for bit, flag in enumerate(STATE_FLAGS):
+        setattr(entity, flag, bool(flags & (1 << bit)))
+    entity.direction = -1 if flags & DIRECTION_FLAG else 1
+
+    entity.current_animation = ANIMATION_NAMES[animation] if animation != NO_ANIMATION else None
+    entity.current_keyframe = keyframe
+    entity.stun_frames = stun_frames
+    entity.attack_sequence = attack_sequence
+
+    # the position is relative to the room so a player moves with its room
+    if isinstance(entity, Player) and room_x != NO_ROOM:
+        entity.current_room.update(room_x, room_y)
+
+
+def pack_snapshot(tick: int, states: Sequence[EntityState]) -> bytearray:
+    """Packs quantized entity states into one contiguous buffer
+
+    Args:
+        tick (int): the simulation tick of the snapshot
+        states (Sequence[EntityState]): the states to pack
+
+    Returns:
+        bytearray: the snapshot
+    """
+    buffer = bytearray(SNAPSHOT_HEADER.size + len(states) * ENTITY_STATE.size)
+
+    SNAPSHOT_HEADER.pack_into(buffer, 0, tick, len(states))
+
+    offset = SNAPSHOT_HEADER.size
+    for state in states:
+        ENTITY_STATE.pack_into(buffer, offset, *state)
+        offset += ENTITY_STATE.size
+
+    return buffer
+
+
+def unpack_snapshot(buffer: Union[bytes, bytearray, memoryview]) -> Tuple[int, Iterator[EntityState]]:
+    """Unpacks the quantized entity states of a snapshot without copying the buffer
+
+    Args:
+        buffer (Union[bytes, bytearray, memoryview]): the snapshot
+
+    Returns:
+        Tuple[int, Iterator[EntityState]]: the simulation tick and the states of the snapshot
+    """
+    view = memoryview(buffer)
+    tick, count = SNAPSHOT_HEADER.unpack_from(view)
+
+    return tick, ENTITY_STATE.iter_unpack(
+        view[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + count * ENTITY_STATE.size]
+    )
+
+
+def encode_snapshot(tick: int, entities: Sequence[SkeletonAnimated]) -> bytearray:
+    """Packs the state of the given entities into one contiguous buffer
+
+    Args:
+        tick (int): the simulation tick of the snapshot
+        entities (Sequence[SkeletonAnimated]): the entities to pack
+
+    Returns:
+        bytearray: the snapshot
+    """
+    return pack_snapshot(tick, [entity_state(entity) for entity in entities])
+
+
+def decode_snapshot(buffer: Union[bytes, bytearray, memoryview], entities: Dict[int, SkeletonAnimated]) -> int:
+    """Unpacks a snapshot directly into the existing entities,
+    the states of unknown entities are ignored
+
+    Args:
+        buffer (Union[bytes, bytearray, memoryview]): the snapshot
+        entities (Dict[int, SkeletonAnimated]): the entities indexed by their id
+
+    Returns:
+        int: the simulation tick of the snapshot
+    """
+    tick, states = unpack_snapshot(buffer)
+
+    for state in states:
+        entity = entities.get(state[0])
+        if entity is not None:
+            apply_entity_state(entity, state)
+
+    return tick
@@ -0,0 +1,274 @@
+import asyncio
+import gc
+import logging
+from functools import partial
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from os import cpu_count
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import SERVER
+from simulation import Simulation
+
+from .match_server import MatchServer, ServerMetrics, UDPServerProtocol
+from .protocol import (
+    Address,
+    JOIN,
+    REDIRECT,
+    MESSAGE_KIND,
+    REDIRECT_MESSAGE,
+    FRAME_LENGTH,
+)
+
+
+async def _serve_worker(host: str, port: int, connection: Connection):
+    """Runs a match server and reports its metrics to the supervisor
+
+    Args:
+        host (str): the address to bind to
+        port (int): the port of the worker
+        connection (Connection): the pipe to the supervisor
+    """
+    server = MatchServer()
+
+    await server.serve_udp(host, port)
+    tcp_server = await server.serve_tcp(host, port)
+
+    async with tcp_server:
+        while True:
+            await asyncio.sleep(SERVER["metrics_interval"])
+            connection.send(server.metrics())
+
+
+def run_worker(host: str, port: int, connection: Connection):
+    """Entry point of a worker process
+
+    Args:
+        host (str): the address to bind to
+        port (int): the port of the worker
+        connection (Connection): the pipe to the supervisor
+    """
+    try:
+        asyncio.run(_serve_worker(host, port, connection))
+    except KeyboardInterrupt:
+        pass
+
+
+
+class WorkerHandle:
+    """The supervisor's view of a worker process
+    """
+
+    def __init__(self, port: int, process: BaseProcess, connection: Connection) -> None:
+        self.port = port
+        self.process = process
+        self.connection = connection
+
+        self.metrics: ServerMetrics = {"matches": 0, "players": 0, "load": 0}
+
+        # players sent to the worker since its last report
+        self.pending_players: int = 0
+
+        self.is_alive: bool = True
+
+
+    @property
+    def score(self) -> Tuple[float, int]:
+        """The expected load of the worker counting the pending players,
+        the number of players breaks the ties between idle workers
+        """
+        players = self.metrics["players"] + self.pending_players
+        player_load = self.metrics["load"] / self.metrics["players"] if self.metrics["players"] else 0
+
+        return (self.metrics["load"] + self.pending_players * player_load, players)
+
+
+
+class Supervisor:
+    """Shards the matches across worker processes
+
+    Each worker runs its own match server on its own port. Clients join
+    through the supervisor which redirects them to the least loaded worker.
+    The assets are loaded before forking so the workers share them
+    """
+
+    def __init__(self, num_workers: int = SERVER["workers"], host: str = SERVER["host"], port: int = SERVER["port"]) -> None:
+        """Constructor of the class Supervisor
+
+        Args:
+            num_workers (int, optional): the number of workers, 0 uses one per core. Defaults to SERVER["workers"].
+            host (str, optional): the address to bind to. Defaults to SERVER["host"].
+            port (int, optional): the port of the supervisor, the workers use the next ones. Defaults to SERVER["port"].
+        """
+        self.num_workers = num_workers or cpu_count()
+        self.host = host
+        self.port = port
+
+        self.workers: List[WorkerHandle] = list()
+
+        # clients are sent to the same worker until its lobby is full
+        # so that a match doesn't get split across workers
+        self.current_worker: Optional[WorkerHandle] = None
+        self.routed_players: int = 0
+
+        # the worker chosen for each client and when, a client that keeps
+        # trying to join before it gets its redirect is sent to the same worker
+        # instead of taking another place in the lobby
+        self.routes: Dict[Address, Tuple[WorkerHandle, float]] = dict()
+
+
+    def start(self):
+        """Loads the assets and forks the workers,
+        must be called before the event loop starts
+        """
+        logging.info("Loading assets before forking %s workers", self.num_workers)
+
+        # the parsed json files, the colliders of the rooms and the shared models
+        # and animations stay cached in this process and are inherited by the workers,
+        # a match only builds its own enemies and players
+        Simulation()
+
+        # keep the loaded objects out of the garbage collector so that
+        # the collections don't write to the shared memory pages
+        gc.freeze()
+
+        context = get_context("fork")
+
+        for index in range(self.num_workers):
+            reader, writer = context.Pipe(duplex=False)
+            port = self.port + 1 + index
+
+            process = context.Process(target=run_worker, args=(self.host, port, writer), daemon=True)
+            process.start()
+            writer.close()
+
+            self.workers.append(WorkerHandle(port, process, reader))
+
+            logging.info("Started worker %s on port %s", process.pid, port)
+
+
+    def _read_metrics(self, worker: WorkerHandle):
+        """Reads a metrics report of a worker
+
+        Args:
+            worker (WorkerHandle): the worker that sent the report
+        """
+        try:
+            worker.metrics = worker.connection.recv()
+            worker.pending_players = 0
+
+        except (EOFError, OSError):
+            logging.error("Worker %s on port %s died", worker.process.pid, worker.port)
+            asyncio.get_running_loop().remove_reader(worker.connection.fileno())
+            worker.is_alive = False
+
+
+    def route(self) -> Optional[WorkerHandle]:
+        """Chooses the worker that will host a new client
+
+        Returns:
+            Optional[WorkerHandle]: the chosen worker or None if all of them died
+        """
+        if self.current_worker is None or not self.current_worker.is_alive or self.routed_players >= SERVER["players_per_match"]:
+            alive = [worker for worker in self.workers if worker.is_alive]
+            if not alive:
+                return None
+
+            self.current_worker = min(alive, key=lambda worker: worker.score)
+            self.routed_players = 0
+
+        self.routed_players += 1
+        self.current_worker.pending_players += 1
+
+        return self.current_worker
+
+
+    def _expire_routes(self, now: float):
+        """Forgets the workers chosen for the clients a while ago
+
+        Args:
+            now (float): the current time (seconds)
+        """
+        # the routes are kept in the order they were made
+        while self.routes:
+            address, (_, routed_at) = next(iter(self.routes.items()))
+            if now - routed_at < SERVER["route_timeout"]:
+                return
+
+            del self.routes[address]
+
+
+    def handle_message(self, address: Address, data: bytes, send: Callable[[bytes], None]):
+        """Redirects the clients that want to join to a worker
+
+        Args:
+            address (Address): the address of the client
+            data (bytes): the message
+            send (Callable[[bytes], None]): sends a message to the client
+        """
+        if not data or MESSAGE_KIND.unpack_from(data)[0] != JOIN:
+            return
+
+        now = monotonic()
+        self._expire_routes(now)
+
+        route = self.routes.get(address)
+        if route is not None and route[0].is_alive:
+            worker = route[0]
+
+        else:
+            worker = self.route()
+            if worker is None:
+                logging.error("No workers available for %s", address)
+                return
+
+            self.routes.pop(address, None)
+            self.routes[address] = (worker, now)
+
+        send(REDIRECT_MESSAGE.pack(REDIRECT, worker.port))
+
+
+    async def _handle_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Redirects a TCP client and closes the connection
+
+        Args:
+            reader (asyncio.StreamReader): the stream of the client
+            writer (asyncio.StreamWriter): the stream to the client
+        """
+        address: Address = writer.get_extra_info("peername")[:2]
+
+        def send(data: bytes):
+            writer.write(FRAME_LENGTH.pack(len(data)) + data)
+
+        try:
+            length, = FRAME_LENGTH.unpack(await reader.readexactly(FRAME_LENGTH.size))
+            self.handle_message(address, await reader.readexactly(length), send)
+            await writer.drain()
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        finally:
+            writer.close()
+
+
+    async def serve(self):
+        """Redirects clients to the workers until the process is stopped
+        """
+        loop = asyncio.get_running_loop()
+
+        for worker in self.workers:
+            loop.add_reader(worker.connection.fileno(), partial(self._read_metrics, worker))
+
+        await loop.create_datagram_endpoint(
+            partial(UDPServerProtocol, self),
+            local_addr=(self.host, self.port)
+        )
+        tcp_server = await asyncio.start_server(self._handle_stream, self.host, self.port)
+
+        logging.info("Supervisor listening on %s:%s", self.host, self.port)
+
+        async with tcp_server:
+            await tcp_server.serve_forever()
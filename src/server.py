@@ -0,0 +1,43 @@
+import asyncio
+import logging
+
+from network import MatchServer, Supervisor
+
+from config import LOGGING, SERVER
+
+
+logging.basicConfig(
+    format='[%(asctime)s] %(thread)s %(levelname)s :  %(message)s'
+)
+logging.getLogger().setLevel(LOGGING["level"])
+
+
+async def serve():
+    server = MatchServer()
+
+    logging.debug("Opening sockets")
+    await server.serve_udp(SERVER["host"], SERVER["port"])
+    tcp_server = await server.serve_tcp(SERVER["host"], SERVER["port"])
+
+    logging.debug("Serving matches")
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+
+def main():
+    # a single process serves the matches by itself
+    if SERVER["workers"] == 1:
+        asyncio.run(serve())
+        return
+
+    logging.debug("Forking workers")
+    supervisor = Supervisor()
+    supervisor.start()
+
+    asyncio.run(supervisor.serve())
+
+
+if __name__ == "__main__":
+    logging.debug("Starting server")
+    main()
+    logging.debug("Server exited successfully")
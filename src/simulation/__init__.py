@@ -0,0 +1,4 @@
+from .simulation import Simulation, IDLE_INPUT, RoomCoords, player_room
+from .lag_compensation import LagCompensation
+from .interpolation import RenderInterpolator
+from .broadphase import SweepAndPrune
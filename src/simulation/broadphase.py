@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+from entities import SkeletonAnimated
+
+
+# left, top, right and bottom of the area that an entity can touch
+Reach = Tuple[float, float, float, float]
+
+
+def reach(entity: SkeletonAnimated) -> Reach:
+    """Returns the area that an entity can touch on this tick
+
+    Args:
+        entity (SkeletonAnimated): the entity
+
+    Returns:
+        Reach: the bounding box of the entity joined with the box around its weapon's hitbox
+    """
+    bounding_box = entity.bounding_box
+    left, top, right, bottom = bounding_box.left, bounding_box.top, bounding_box.right, bounding_box.bottom
+
+    if entity.weapon is not None and entity.weapon.hitbox is not None:
+        hitbox_left, hitbox_top, hitbox_right, hitbox_bottom = entity.weapon.hitbox.aabb
+        left = min(left, hitbox_left)
+        top = min(top, hitbox_top)
+        right = max(right, hitbox_right)
+        bottom = max(bottom, hitbox_bottom)
+
+    return left, top, right, bottom
+
+
+class SweepAndPrune:
+    """Finds the entities of a room that are close enough to interact
+
+    The entities are kept sorted by the left side of their reach and only the
+    ones whose reaches overlap on the x axis are checked on the y axis.
+    The order is kept between ticks and the entities barely move in a tick,
+    so sorting it again is close to a single pass instead of a full sort
+    """
+
+    def __init__(self) -> None:
+        """Constructor of the class SweepAndPrune
+        """
+        # entity ids sorted by the left side of their reach on the last update
+        self.order: List[int] = list()
+
+        # ids of the entities whose reaches overlap, the lowest id first
+        self.pairs: Set[Tuple[int, int]] = set()
+
+
+    def update(self, entities: Iterable[SkeletonAnimated]) -> Set[Tuple[int, int]]:
+        """Sorts the entities again and finds the pairs whose reaches overlap
+
+        Touching reaches overlap so that every hit found by an exact test
+        is inside a pair
+
+        Args:
+            entities (Iterable[SkeletonAnimated]): the entities in the room
+
+        Returns:
+            Set[Tuple[int, int]]: the pairs of entity ids, the lowest id first
+        """
+        reaches: Dict[int, Reach] = {entity.entity_id: reach(entity) for entity in entities}
+
+        # keep the order of the last update and add the entities that entered the room
+        order = [entity_id for entity_id in self.order if entity_id in reaches]
+        known = set(order)
+        order.extend(entity_id for entity_id in reaches if entity_id not in known)
+
+        # insertion sort
+        for i in range(1, len(order)):
+            entity_id = order[i]
+            left = reaches[entity_id][0]
+
+            j = i - 1
+            while j >= 0 and reaches[order[j]][0] > left:
+                order[j + 1] = order[j]
+                j -= 1
+            order[j + 1] = entity_id
+
+        self.order = order
+
+        #* SWEEP
+        self.pairs = set()
+        active: List[int] = list()
+        for entity_id in order:
+            left, top, _, bottom = reaches[entity_id]
+
+            # the entities that end before this one starts can't overlap the next ones either
+            active = [other_id for other_id in active if reaches[other_id][2] >= left]
+
+            for other_id in active:
+                if reaches[other_id][1] <= bottom and top <= reaches[other_id][3]:
+                    self.pairs.add((min(entity_id, other_id), max(entity_id, other_id)))
+
+            active.append(entity_id)
+
+        return self.pairs
+
+
+    def overlap(self, entity: SkeletonAnimated, other: SkeletonAnimated) -> bool:
+        """Returns True if two entities were close enough to interact on the last update
+
+        Args:
+            entity (SkeletonAnimated): an entity
+            other (SkeletonAnimated): another entity
+
+        Returns:
+            bool: True if their reaches overlap
+        """
+        return (min(entity.entity_id, other.entity_id), max(entity.entity_id, other.entity_id)) in self.pairs
+
+
+    def __repr__(self) -> str:
+        return f"SweepAndPrune(entities={len(self.order)}, pairs={len(self.pairs)})"
@@ -0,0 +1,155 @@
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from numpy import array, float64, ndarray
+from pygame import Vector2
+
+from entities import SkeletonAnimated, Player
+
+
+# top left corner of the bounding box of an entity on a tick followed by its points,
+# the room of a player and the angle of its weapon's hitbox
+EntityState = Tuple[ndarray, Optional[Tuple[int, int]], float]
+
+
+def _points(entity: SkeletonAnimated) -> List[Vector2]:
+    """Returns the points that are drawn for an entity
+
+    The points are the vectors of the entity itself so they can be moved
+    in place, some of them are shared between bones and appear more than once
+
+    Args:
+        entity (SkeletonAnimated): the entity
+
+    Returns:
+        List[Vector2]: the points of the entity
+    """
+    points = [entity.pos, entity.model.origin]
+
+    for bone in entity.model.bones:
+        points.append(bone.a)
+        points.append(bone.b)
+
+    if entity.weapon is not None:
+        for point in entity.weapon.follow_line:
+            # a bow follows two lines
+            if isinstance(point, list):
+                points.extend(point)
+            else:
+                points.append(point)
+
+        if entity.weapon.hitbox is not None:
+            points.append(entity.weapon.hitbox.center)
+
+    detection_ray = getattr(entity, "detection_ray", None)
+    if detection_ray is not None:
+        points.append(detection_ray)
+
+    return points
+
+
+def _hitbox_angle(entity: SkeletonAnimated) -> float:
+    """Returns the angle of the hitbox of the weapon of an entity
+
+    Args:
+        entity (SkeletonAnimated): the entity
+
+    Returns:
+        float: the angle in degrees or 0 if the entity has no hitbox
+    """
+    if entity.weapon is None or entity.weapon.hitbox is None:
+        return 0
+
+    return entity.weapon.hitbox.angle
+
+
+class RenderInterpolator:
+    """Draws the entities between the last two ticks of the simulation
+
+    The simulation advances at a fixed tick rate and the frames are rendered
+    whenever the display is ready, so a frame usually falls between two ticks.
+    The state of the entities is captured after each tick and the frames
+    blend the previous and the current one instead of showing the last tick
+    until the next one arrives
+    """
+
+    def __init__(self) -> None:
+        """Constructor of the class RenderInterpolator
+        """
+        self.previous: Dict[int, EntityState] = dict()
+        self.current: Dict[int, EntityState] = dict()
+
+
+    def capture(self, entities: Iterable[SkeletonAnimated]):
+        """Stores the state of the entities after a tick of the simulation
+
+        Args:
+            entities (Iterable[SkeletonAnimated]): the entities that will be drawn
+        """
+        self.previous = self.current
+        self.current = {
+            entity.entity_id: (
+                array([entity.bounding_box.topleft] + [tuple(point) for point in _points(entity)], dtype=float64),
+                (int(entity.current_room.x), int(entity.current_room.y)) if isinstance(entity, Player) else None,
+                _hitbox_angle(entity)
+            )
+            for entity in entities
+        }
+
+
+    @contextmanager
+    def interpolate(self, entities: Iterable[SkeletonAnimated], alpha: float) -> Iterator[None]:
+        """Moves the entities to a state between the previous and the current tick
+        while the context is open and puts them back on the current tick after it
+
+        Entities that just appeared, changed rooms or changed their model
+        are drawn on the current tick
+
+        Args:
+            entities (Iterable[SkeletonAnimated]): the entities that will be drawn
+            alpha (float): how far the frame is from the previous tick to the current one (0 to 1)
+        """
+        moved: List[Tuple[SkeletonAnimated, List[Vector2], EntityState]] = list()
+
+        for entity in entities:
+            previous = self.previous.get(entity.entity_id)
+            current = self.current.get(entity.entity_id)
+            if previous is None or current is None:
+                continue
+
+            points = _points(entity)
+            if previous[1] != current[1] or len(points) + 1 != len(current[0]) or len(points) + 1 != len(previous[0]):
+                continue
+
+            self._apply(entity, points, previous[0] + (current[0] - previous[0]) * alpha, previous[2], current[2], alpha)
+            moved.append((entity, points, current))
+
+        try:
+            yield
+        finally:
+            for entity, points, current in moved:
+                self._apply(entity, points, current[0], current[2], current[2], 1)
+
+
+    @staticmethod
+    def _apply(entity: SkeletonAnimated, points: List[Vector2], positions: ndarray, previous_angle: float, angle: float, alpha: float):
+        """Moves the points of an entity and everything that depends on them
+
+        Args:
+            entity (SkeletonAnimated): the entity
+            points (List[Vector2]): the points of the entity
+            positions (ndarray): the new top left corner of the bounding box and position of each point
+            previous_angle (float): the angle of the hitbox on the previous tick
+            angle (float): the angle of the hitbox on the current tick
+            alpha (float): how far the angle is from the previous tick to the current one
+        """
+        positions = positions.tolist()
+
+        entity.bounding_box.topleft = positions[0]
+        for point, position in zip(points, positions[1:]):
+            point.update(position)
+
+        if entity.weapon is not None and entity.weapon.hitbox is not None:
+            # turn through the shortest side
+            entity.weapon.hitbox.set_rotation(previous_angle + ((angle - previous_angle + 180) % 360 - 180) * alpha)
+            entity.weapon.hitbox.transform()
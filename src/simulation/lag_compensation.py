@@ -0,0 +1,115 @@
+from typing import Iterable, Optional
+
+from numpy import zeros, full, int32, int64, concatenate
+
+from config import SERVER
+from entities import SkeletonAnimated
+from utils import BoundingBox
+
+
+class LagCompensation:
+    """Keeps a short history of the bounding boxes of every entity so that
+    hits can be checked against the world as an attacker saw it
+
+    The history is a ring buffer of preallocated arrays indexed by tick and entity id,
+    recording a tick only writes into the arrays
+    """
+
+    def __init__(self, history_size: int = SERVER["rewind_history"], capacity: int = 64) -> None:
+        """Constructor of the class LagCompensation
+
+        Args:
+            history_size (int, optional): the number of ticks kept. Defaults to SERVER["rewind_history"].
+            capacity (int, optional): the initial number of entities. Defaults to 64.
+        """
+        self.history_size = history_size
+        self.newest_tick: int = -1
+
+        # only the entities in occupied rooms are recorded on a tick,
+        # so each entity keeps the tick that each of its slots holds
+        self.recorded_ticks = full((history_size, capacity), -1, dtype=int64)
+
+        # x, y, width, height
+        self.bounding_boxes = zeros((history_size, capacity, 4), dtype=int32)
+
+
+    def _reserve(self, entity_id: int):
+        """Grows the arrays when an entity id doesn't fit
+
+        Args:
+            entity_id (int): the entity id
+        """
+        capacity = self.bounding_boxes.shape[1]
+        if entity_id < capacity:
+            return
+
+        extra = max(capacity, entity_id + 1 - capacity)
+
+        self.recorded_ticks = concatenate((self.recorded_ticks, full((self.history_size, extra), -1, dtype=int64)), axis=1)
+        self.bounding_boxes = concatenate((self.bounding_boxes, zeros((self.history_size, extra, 4), dtype=int32)), axis=1)
+
+
+    def record(self, tick: int, entities: Iterable[SkeletonAnimated]):
+        """Records the bounding boxes of the entities on a tick
+
+        Args:
+            tick (int): the simulation tick
+            entities (Iterable[SkeletonAnimated]): the entities
+        """
+        slot = tick % self.history_size
+        self.newest_tick = max(self.newest_tick, tick)
+
+        bounding_boxes = self.bounding_boxes
+        for entity in entities:
+            entity_id = entity.entity_id
+            if entity_id >= bounding_boxes.shape[1]:
+                self._reserve(entity_id)
+                bounding_boxes = self.bounding_boxes
+
+            self.recorded_ticks[slot, entity_id] = tick
+
+            bounding_box = entity.bounding_box
+            bounding_boxes[slot, entity_id, 0] = bounding_box.x
+            bounding_boxes[slot, entity_id, 1] = bounding_box.y
+            bounding_boxes[slot, entity_id, 2] = bounding_box.width
+            bounding_boxes[slot, entity_id, 3] = bounding_box.height
+
+
+    def _slot(self, entity_id: int, tick: int) -> Optional[int]:
+        """Returns the slot of the history that holds an entity on a tick, the ticks older
+        than the history are clamped to the oldest one
+
+        Args:
+            entity_id (int): the entity id
+            tick (int): the simulation tick
+
+        Returns:
+            Optional[int]: the slot or None if the entity wasn't recorded on that tick
+        """
+        if entity_id >= self.bounding_boxes.shape[1] or self.newest_tick < 0:
+            return None
+
+        tick = min(self.newest_tick, max(tick, self.newest_tick - self.history_size + 1))
+        slot = tick % self.history_size
+
+        return slot if self.recorded_ticks[slot, entity_id] == tick else None
+
+
+    def rewind_bounding_box(self, entity_id: int, tick: int, bounding_box: BoundingBox) -> bool:
+        """Writes the bounding box an entity had on a past tick into the given bounding box
+
+        Args:
+            entity_id (int): the entity id
+            tick (int): the simulation tick
+            bounding_box (BoundingBox): the bounding box to write to
+
+        Returns:
+            bool: True if the entity was recorded on that tick, False otherwise
+        """
+        slot = self._slot(entity_id, tick)
+        if slot is None:
+            return False
+
+        bounding_box.update(*self.bounding_boxes[slot, entity_id].tolist())
+
+        return True
@@ -0,0 +1,322 @@
+from typing import Dict, List, Optional, Sequence
+
+from numpy import (
+    ndarray, array, arange, abs as np_abs, stack, where, trunc, floor, full, zeros, ones,
+    concatenate, lexsort, minimum, maximum, errstate, inf, float64, int64, bool_
+)
+
+from blocks import Collider, ColliderGrid
+from config import PHYSICS
+from entities import SkeletonAnimated
+
+
+Collisions = Dict[str, Optional[Collider]]
+
+# order of the sides in the distances, ties resolve to the first one
+SIDES = ("top", "bottom", "left", "right")
+TOP, BOTTOM, LEFT, RIGHT = range(len(SIDES))
+
+
+def _axis_times(start_min: ndarray, start_max: ndarray, collider_min: ndarray, collider_max: ndarray, move: ndarray):
+    """Returns the fractions of the movements at which the intervals start and stop
+    overlapping the static intervals on one axis, like entities.entity._axis_times
+
+    Returns:
+        Tuple[ndarray, ndarray]: the entry and the exit times
+    """
+    with errstate(divide="ignore", invalid="ignore"):
+        towards_collider_min = (collider_min - start_max) / move
+        towards_collider_max = (collider_max - start_min) / move
+
+    # not moving on the axis, the intervals either always or never overlap
+    overlapping = (start_min < collider_max) & (start_max > collider_min)
+    still_entry = where(overlapping, -inf, inf)
+
+    entry = where(move > 0, towards_collider_min, where(move < 0, towards_collider_max, still_entry))
+    exit = where(move > 0, towards_collider_max, where(move < 0, towards_collider_min, -still_entry))
+
+    return entry, exit
+
+
+def _friction(vel_x: ndarray, friction: ndarray) -> ndarray:
+    """Slows the horizontal velocities down by the friction without changing their direction
+
+    Args:
+        vel_x (ndarray): the horizontal velocities
+        friction (ndarray): the friction applied to each velocity
+
+    Returns:
+        ndarray: the new velocities
+    """
+    return where(vel_x < 0, minimum(vel_x + friction, 0), maximum(vel_x - friction, 0))
+
+
+class PhysicsBatch:
+    """Runs the physics of many entities of a room at once
+
+    The positions, velocities and states of the entities are copied into
+    arrays, integrated and resolved against the colliders of the room with
+    vectorized operations and written back to the entities.
+    The results are the same as calling SkeletonAnimated.update_physics
+    on each entity, the sweeps of all the pairs of entities and nearby colliders run at once and
+    the bounding boxes are truncated to integers like pygame does
+    """
+
+    def __init__(self, min_entities: int = PHYSICS["batch_min_entities"]) -> None:
+        """Constructor of the class PhysicsBatch
+
+        Args:
+            min_entities (int, optional): the number of entities needed to run the batch,
+            fewer entities are updated one by one. Defaults to PHYSICS["batch_min_entities"].
+        """
+        self.min_entities = min_entities
+
+
+    def step(self, entities: Sequence[SkeletonAnimated], colliders: ColliderGrid) -> List[Collisions]:
+        """Integrates the entities and resolves their collisions
+
+        Args:
+            entities (Sequence[SkeletonAnimated]): the entities of the room
+            colliders (ColliderGrid): the colliders of the room
+
+        Returns:
+            List[Collisions]: the colliders that each entity collided with
+        """
+        if len(entities) < self.min_entities:
+            return [entity.update_physics(colliders) for entity in entities]
+
+        state = array(
+            [
+                (
+                    entity.pos.x, entity.pos.y,
+                    entity.vel.x, entity.vel.y,
+                    entity.bounding_box.width, entity.bounding_box.height,
+                    entity.has_gravity, entity.is_moving
+                )
+                for entity in entities
+            ],
+            dtype=float64
+        )
+
+        pos_x, pos_y, vel_x, vel_y, width, height, has_gravity, is_moving = state.T
+        half_width = floor(width / 2)
+        is_moving = is_moving.astype(bool_)
+
+
+        #! INTEGRATION
+        # the entities stop climbing on every update so only the ones without gravity don't fall
+        vel_y = vel_y + has_gravity * PHYSICS["gravity"]
+        pos_x = pos_x + vel_x
+        pos_y = pos_y + vel_y
+
+        # bounding boxes placed on the midbottom of the positions
+        left = trunc(pos_x) - half_width
+        top = trunc(pos_y) - height
+
+
+        #! CONTINUOUS COLLISIONS
+        entities_range = arange(len(entities))
+        is_colliding = zeros(len(entities), dtype=bool_)
+        contacts = full((len(entities), len(SIDES)), -1, dtype=int64)
+
+        candidates = self._candidates(left, top, width, height, vel_x, vel_y, colliders)
+        boxes = colliders.boxes
+
+        # the sweeps only test the pairs of entities and candidate colliders, sorted by entity and collider
+        pair_entities, pair_colliders = candidates.nonzero()
+        pair_boxes = boxes[pair_colliders]
+        pair_half_width = half_width[pair_entities]
+        pair_width = width[pair_entities]
+        pair_height = height[pair_entities]
+
+        # midbottom of the bounding boxes swept from the positions before the integration
+        sweep_x = state[:, 0].copy()
+        sweep_y = state[:, 1].copy()
+        move_x = pos_x - sweep_x
+        move_y = pos_y - sweep_y
+        vel_x = vel_x.copy()
+
+        is_sweeping = ones(len(entities), dtype=bool_)
+        has_collided = zeros(len(entities), dtype=bool_)
+
+        for _ in range(PHYSICS["sweep_iterations"]):
+            pair_sweep_x = sweep_x[pair_entities]
+            pair_sweep_y = sweep_y[pair_entities]
+            pair_move_x = move_x[pair_entities]
+            pair_move_y = move_y[pair_entities]
+
+            box_left = pair_sweep_x - pair_half_width
+            entry_x, exit_x = _axis_times(box_left, box_left + pair_width, pair_boxes[:, 0], pair_boxes[:, 2], pair_move_x)
+            entry_y, exit_y = _axis_times(pair_sweep_y - pair_height, pair_sweep_y, pair_boxes[:, 1], pair_boxes[:, 3], pair_move_y)
+
+            entry = maximum(entry_x, entry_y)
+            hits = (
+                is_sweeping[pair_entities] & (entry < minimum(exit_x, exit_y)) & (entry >= 0) & (entry <= 1)
+            ).nonzero()[0]
+
+            if not len(hits):
+                break
+
+            # the first collider on the way of each entity, the first candidate on ties
+            order = lexsort((hits, entry[hits], pair_entities[hits]))
+            hit_entities = pair_entities[hits[order]]
+            hits = hits[order[concatenate(((True,), hit_entities[1:] != hit_entities[:-1]))]]
+
+            hit = pair_entities[hits]
+            indices = pair_colliders[hits]
+            time = entry[hits]
+
+            is_sweeping[:] = False
+            is_sweeping[hit] = True
+            has_collided[hit] = True
+
+            # the last axis to start overlapping is the one that was hit
+            hit_move_x = move_x[hit]
+            hit_move_y = move_y[hit]
+            side = where(entry_y[hits] >= entry_x[hits], where(hit_move_y > 0, TOP, BOTTOM), where(hit_move_x > 0, LEFT, RIGHT))
+
+            # move until the hit and keep the rest of the movement
+            hit_x = sweep_x[hit] + hit_move_x * time
+            hit_y = sweep_y[hit] + hit_move_y * time
+            hit_move_x = hit_move_x * (1 - time)
+            hit_move_y = hit_move_y * (1 - time)
+
+            # stop against the side that was hit and slide along it
+            collider_left, collider_top, collider_right, collider_bottom = boxes[indices].T
+
+            landed = side == TOP
+            bumped = side == BOTTOM
+            blocked_x = side >= LEFT
+
+            sweep_y[hit] = where(landed, collider_top, where(bumped, collider_bottom + height[hit], hit_y))
+            sweep_x[hit] = where(
+                side == LEFT, collider_left - width[hit] + half_width[hit],
+                where(side == RIGHT, collider_right + half_width[hit], hit_x)
+            )
+            move_y[hit] = where(landed | bumped, 0, hit_move_y)
+            move_x[hit] = where(blocked_x, 0, hit_move_x)
+
+            vel_y[hit] = where(landed | bumped, 0, vel_y[hit])
+            vel_x[hit] = _friction(
+                where(blocked_x, 0, vel_x[hit]),
+                where(landed & ~is_moving[hit], colliders.frictions[indices], 0)
+            )
+
+            is_colliding[hit] = True
+            contacts[hit, side] = indices
+
+        pos_x = where(has_collided, sweep_x + move_x, pos_x)
+        pos_y = where(has_collided, sweep_y + move_y, pos_y)
+
+        left = trunc(pos_x) - half_width
+        top = trunc(pos_y) - height
+
+
+        #! OVERLAPS
+        # the entities that started the tick inside a collider resolve their
+        # candidate colliders in order, the next candidate of every entity is resolved at the same time
+        # the other entities can't be pushed into a collider
+        pair_left = left[pair_entities]
+        pair_top = top[pair_entities]
+        is_overlapping = (pair_left < pair_boxes[:, 2]) & (pair_left + pair_width > pair_boxes[:, 0]) & \
+            (pair_top < pair_boxes[:, 3]) & (pair_top + pair_height > pair_boxes[:, 1])
+
+        has_candidates = zeros(len(entities), dtype=bool_)
+        has_candidates[pair_entities[is_overlapping]] = True
+
+        while has_candidates.any():
+            indices = candidates.argmax(axis=1)
+            candidates[entities_range, indices] = False
+
+            collider_left, collider_top, collider_right, collider_bottom = colliders.boxes[indices].T
+            right = left + width
+            bottom = top + height
+
+            hit = has_candidates & (left < collider_right) & (right > collider_left) & (top < collider_bottom) & (bottom > collider_top)
+            has_candidates &= candidates.any(axis=1)
+
+            if not hit.any():
+                continue
+
+            is_colliding |= hit
+
+            side = stack(
+                (
+                    np_abs(bottom - vel_y - collider_top),
+                    np_abs(top - vel_y - collider_bottom),
+                    np_abs(right - vel_x - collider_left),
+                    np_abs(left - vel_x - collider_right),
+                )
+            ).argmin(axis=0)
+            side[~hit] = -1
+
+            landed = side == TOP
+            bumped = side == BOTTOM
+            blocked_left = side == LEFT
+            blocked_right = side == RIGHT
+
+            top = where(landed, collider_top - height, where(bumped, collider_bottom, top))
+            left = where(blocked_left, collider_left - width, where(blocked_right, collider_right, left))
+
+            vel_y = where(landed | bumped, 0, vel_y)
+            vel_x = where(blocked_left | blocked_right, 0, vel_x)
+
+            # friction when the entity landed and is not moving
+            vel_x = _friction(vel_x, where(landed & ~is_moving, colliders.frictions[indices], 0))
+
+            contacts[entities_range[hit], side[hit]] = indices[hit]
+
+            pos_x = where(hit, left + half_width, pos_x)
+            pos_y = where(hit, top + height, pos_y)
+
+
+        #! WRITE BACK
+        entity_collisions = list()
+        collider_list = colliders.colliders
+
+        for entity, previous, position_x, position_y, velocity_x, velocity_y, box_left, box_top, colliding, (top_contact, bottom_contact, left_contact, right_contact) in zip(
+            entities, state[:, 0:2].tolist(), pos_x.tolist(), pos_y.tolist(), vel_x.tolist(), vel_y.tolist(),
+            left.astype(int64).tolist(), top.astype(int64).tolist(), is_colliding.tolist(), contacts.tolist()
+        ):
+            entity.is_climbing = False
+            entity.previous_pos.update(previous)
+            entity.pos.update(position_x, position_y)
+            entity.vel.update(velocity_x, velocity_y)
+            entity.bounding_box.topleft = (box_left, box_top)
+
+            entity.is_colliding = colliding
+            entity.is_grounded = top_contact > -1
+            if entity.is_grounded:
+                entity.is_jumping = False
+
+            entity_collisions.append({
+                "top": collider_list[top_contact] if top_contact > -1 else None,
+                "bottom": collider_list[bottom_contact] if bottom_contact > -1 else None,
+                "left": collider_list[left_contact] if left_contact > -1 else None,
+                "right": collider_list[right_contact] if right_contact > -1 else None,
+            })
+
+        return entity_collisions
+
+
+    @staticmethod
+    def _candidates(left: ndarray, top: ndarray, width: ndarray, height: ndarray, vel_x: ndarray, vel_y: ndarray, colliders: ColliderGrid) -> ndarray:
+        """Returns the colliders that share a cell of the grid with the area
+        swept by each entity, the same ones that Entity.check_collisions queries
+
+        Returns:
+            ndarray: a matrix with a row per entity and a column per collider
+        """
+        # the area covered by each bounding box since the last tick
+        previous_left = left + trunc(-vel_x)
+        previous_top = top + trunc(-vel_y)
+
+        # with a margin for the fractional part of the positions
+        cell_size = colliders.cell_size
+        first_x = ((minimum(left, previous_left) - 1) // cell_size)[:, None]
+        first_y = ((minimum(top, previous_top) - 1) // cell_size)[:, None]
+        last_x = ((maximum(left, previous_left) + width) // cell_size)[:, None]
+        last_y = ((maximum(top, previous_top) + height) // cell_size)[:, None]
+
+        cell_ranges = colliders.cell_ranges
+        return (first_x <= cell_ranges[:, 2]) & (last_x >= cell_ranges[:, 0]) & (first_y <= cell_ranges[:, 3]) & (last_y >= cell_ranges[:, 1])
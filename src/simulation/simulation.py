@@ -0,0 +1,378 @@
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from time import perf_counter, sleep
+
+from config import MAPS, SERVER, SIMULATION
+from utils import PlayerInput, BoundingBox
+from entities import SkeletonAnimated, Player, Enemy, update_models
+from weapons import Sword
+from maps import Map, Room
+
+from .lag_compensation import LagCompensation
+from .physics import PhysicsBatch
+from .broadphase import SweepAndPrune
+
+
+RoomCoords = Tuple[int, int]
+
+IDLE_INPUT: PlayerInput = {
+    "movement": {"left": False, "right": False, "jump": False},
+    "attack": {"attack": False, "guard": False}
+}
+
+
+def player_room(player: Player) -> RoomCoords:
+    """Returns the coordinates of the room a player is in
+
+    Args:
+        player (Player): the player
+
+    Returns:
+        RoomCoords: the room coordinates in the map
+    """
+    return (int(player.current_room.x), int(player.current_room.y))
+
+
+class Simulation:
+    """The simulation core of a match
+
+    Holds the map, the players, the enemies and the weapons and advances
+    all of them one tick at a time. It doesn't depend on a display
+    so it can be used by a server to run matches without rendering anything
+
+    Only the rooms with players run a full tick. The rooms next to them
+    catch up on the physics of their enemies every few ticks and the other
+    rooms sleep until a player comes close, so the cost of a tick depends
+    on the occupied rooms instead of the size of the map
+    """
+
+    def __init__(self, headless: bool = True, tick_rate: int = SERVER["tick_rate"], lag_compensation: bool = False) -> None:
+        """Constructor of the class Simulation
+
+        Args:
+            headless (bool, optional): load the map without textures. Defaults to True.
+            tick_rate (int, optional): the number of ticks per second. Defaults to SERVER["tick_rate"].
+            lag_compensation (bool, optional): keep a history of the entities to check hits
+            against the ticks the attackers saw. Defaults to False.
+        """
+        self.map = Map(headless)
+
+        self.tick_rate = tick_rate
+        self.tick_interval = 1 / tick_rate
+        self.tick: int = 0
+
+        self.players: Dict[int, Player] = dict()
+
+        self.lag_compensation: Optional[LagCompensation] = LagCompensation() if lag_compensation else None
+        self._hurt_box = BoundingBox(0, 0, 0, 0)
+
+        self.physics = PhysicsBatch()
+
+        # the entities of each room stay almost sorted between ticks
+        self.broadphases: Dict[RoomCoords, SweepAndPrune] = dict()
+
+        # number of ticks that each room was simulated for
+        # (the map stores the rooms by line and column)
+        self.room_ticks: Dict[RoomCoords, int] = {(x, y): 0 for y, x in self.map.rooms}
+
+        # players that changed rooms on the last tick (id, previous room, new room)
+        self.room_transitions: List[Tuple[int, RoomCoords, RoomCoords]] = list()
+
+        # every entity in the simulation gets an unique id
+        self.entities: Dict[int, SkeletonAnimated] = dict()
+        self._next_entity_id: int = 0
+        for room in self.map.rooms.values():
+            for enemy in room.enemies:
+                self.register_entity(enemy)
+
+
+    def register_entity(self, entity: SkeletonAnimated) -> int:
+        """Assigns an unique id to an entity of the simulation
+
+        Args:
+            entity (SkeletonAnimated): the entity to identify
+
+        Returns:
+            int: the id of the entity
+        """
+        entity.entity_id = self._next_entity_id
+        self._next_entity_id += 1
+
+        self.entities[entity.entity_id] = entity
+
+        return entity.entity_id
+
+
+    def add_player(self) -> Player:
+        """Spawns a new player on the starting room of the map
+
+        Returns:
+            Player: the spawned player
+        """
+        player = Player((30,250))
+        player.set_pos((900,400))
+        player.current_room.update(self.map.map_size // 2, self.map.map_size // 2)
+
+        player.set_weapon(Sword(), "braco_e")
+
+        self.players[self.register_entity(player)] = player
+
+        logging.info("Player %s joined the simulation", player.entity_id)
+
+        return player
+
+
+    def remove_player(self, player_id: int):
+        """Removes a player from the simulation
+
+        Args:
+            player_id (int): the id of the player
+        """
+        if self.players.pop(player_id, None) is not None:
+            del self.entities[player_id]
+            logging.info("Player %s left the simulation", player_id)
+
+
+    def room_entities(self, room_coords: RoomCoords) -> List[SkeletonAnimated]:
+        """Returns every entity inside a room
+
+        Args:
+            room_coords (Tuple[int, int]): the room coordinates in the map
+
+        Returns:
+            List[SkeletonAnimated]: the enemies and the players in the room
+        """
+        room = self.map.get_room(room_coords)
+        if room is None:
+            return list()
+
+        entities: List[SkeletonAnimated] = list(room.enemies)
+        for player in self.players.values():
+            if player.current_room == room_coords:
+                entities.append(player)
+
+        return entities
+
+
+    def occupied_rooms(self) -> Iterator[Tuple[Room, List[Player]]]:
+        """Yields every room that has players in it
+
+        Yields:
+            Tuple[Room, List[Player]]: the room and the players inside it
+        """
+        rooms: Dict[RoomCoords, List[Player]] = dict()
+        for player in self.players.values():
+            rooms.setdefault(player_room(player), list()).append(player)
+
+        for room_coords, players in rooms.items():
+            room = self.map.get_room(room_coords)
+            if room is not None:
+                yield room, players
+
+
+    def step(self, inputs: Dict[int, PlayerInput], view_ticks: Optional[Dict[int, int]] = None):
+        """Advances the simulation by one tick
+
+        Args:
+            inputs (Dict[int, PlayerInput]): the input of each player on this tick,
+            the players with no input are considered idle
+            view_ticks (Dict[int, int], optional): the tick that each player was seeing when
+            it sent its input, only used with lag compensation. Defaults to None.
+        """
+        self.room_transitions.clear()
+
+        occupied_rooms = list(self.occupied_rooms())
+        for room, players in occupied_rooms:
+            room_coords = player_room(players[0])
+
+            # the room may have been sleeping until now
+            self.catch_up(room_coords, room)
+
+            #! ENEMIES
+            # the physics of all the enemies of the room run in a single batch
+            enemy_collisions = self.physics.step(room.enemies, room.collider_grid)
+            update_models(room.enemies, room.collider_grid)
+
+            # pairs of entities that are close enough to interact
+            broadphase = self.broadphases.setdefault(player_room(players[0]), SweepAndPrune())
+            broadphase.update(room.enemies + players)
+
+            for enemy, collisions in zip(room.enemies, enemy_collisions):
+                # enemies target the closest player in the room
+                target = min(players, key=lambda player, enemy=enemy: abs(player.pos.x - enemy.pos.x))
+
+                # a rewound bounding box isn't where the broadphase saw the enemy
+                hurt_box = self.hurt_box(enemy, target, view_ticks)
+                enemy.update_behaviour(
+                    collisions,
+                    target,
+                    hurt_box,
+                    hurt_box is not None or broadphase.overlap(enemy, target),
+                    room.collider_grid
+                )
+
+
+            #! PLAYERS
+            for player in players:
+                player_input = inputs.get(player.entity_id, IDLE_INPUT)
+
+                player.move(player_input["movement"])
+                player.attack(player_input["attack"])
+
+            self.physics.step(players, room.collider_grid)
+            update_models(players, room.collider_grid)
+
+            for player in players:
+                previous_room = player_room(player)
+                if self.navigate(player):
+                    self.room_transitions.append((player.entity_id, previous_room, player_room(player)))
+
+            self.room_ticks[room_coords] = self.tick + 1
+
+        self.tick += 1
+
+        #! NEIGHBOUR ROOMS
+        # a reduced tick that only moves the enemies that aren't resting
+        for room_coords in self.neighbour_rooms([player_room(players[0]) for _, players in occupied_rooms]):
+            if self.tick - self.room_ticks[room_coords] >= SIMULATION["neighbour_tick_interval"]:
+                self.catch_up(room_coords, self.map.get_room(room_coords))
+
+        if self.lag_compensation is not None:
+            for room, players in self.occupied_rooms():
+                self.lag_compensation.record(self.tick, room.enemies)
+                self.lag_compensation.record(self.tick, players)
+
+
+    def neighbour_rooms(self, occupied_rooms: List[RoomCoords]) -> List[RoomCoords]:
+        """Returns the rooms next to the occupied rooms that have no players in them
+
+        Args:
+            occupied_rooms (List[RoomCoords]): the coordinates of the rooms with players
+
+        Returns:
+            List[RoomCoords]: the coordinates of the neighbour rooms
+        """
+        neighbours: List[RoomCoords] = list()
+        for x, y in occupied_rooms:
+            for room_coords in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if room_coords in self.room_ticks and room_coords not in occupied_rooms and room_coords not in neighbours:
+                    neighbours.append(room_coords)
+
+        return neighbours
+
+
+    def catch_up(self, room_coords: RoomCoords, room: Room):
+        """Runs the physics of the enemies of a room for the ticks that it missed
+
+        The enemies have no player to follow while nobody is in the room so
+        only the ones that are still falling or sliding are moved, and the room
+        stops as soon as all of them are resting
+
+        Args:
+            room_coords (RoomCoords): the room coordinates in the map
+            room (Room): the room
+        """
+        ticks = min(self.tick - self.room_ticks[room_coords], SIMULATION["max_catch_up_ticks"])
+        self.room_ticks[room_coords] = self.tick
+
+        if ticks <= 0:
+            return
+
+        # the enemies only switch animation when they start or stop moving
+        # so the ones that stop here must switch to idling themselves
+        for enemy in room.enemies:
+            if enemy.is_moving:
+                enemy.is_moving = False
+                enemy.change_animation_state("idling")
+
+        for _ in range(ticks):
+            awake = [
+                enemy for enemy in room.enemies
+                if not (enemy.is_grounded and enemy.vel.x == 0 and enemy.vel.y == 0)
+            ]
+            if not awake:
+                break
+
+            self.physics.step(awake, room.collider_grid)
+
+        update_models(room.enemies, room.collider_grid)
+
+
+    def hurt_box(self, enemy: Enemy, attacker: Player, view_ticks: Optional[Dict[int, int]]) -> Optional[BoundingBox]:
+        """Returns the bounding box that the enemy had on the tick that the attacker was seeing
+
+        Args:
+            enemy (Enemy): the enemy that can be hit
+            attacker (Player): the attacking player
+            view_ticks (Optional[Dict[int, int]]): the tick that each player was seeing
+
+        Returns:
+            Optional[BoundingBox]: the rewound bounding box or None to use the current one
+        """
+        if self.lag_compensation is None or view_ticks is None or attacker.entity_id not in view_ticks:
+            return None
+
+        if not self.lag_compensation.rewind_bounding_box(enemy.entity_id, view_ticks[attacker.entity_id], self._hurt_box):
+            return None
+
+        return self._hurt_box
+
+
+    def navigate(self, player: Player) -> bool:
+        """Moves the player to the neighbour room when it crosses one of the borders
+        of its current room
+
+        Args:
+            player (Player): the player to move
+
+        Returns:
+            bool: True if the player changed rooms, False otherwise
+        """
+        if player.bounding_box.right < 0 and self.map.get_room(player.current_room + (-1,0)) is not None:
+            player.current_room += (-1,0)
+            player.set_pos((MAPS["room_size"][0] - player.bounding_box.width, player.pos.y))
+            return True
+
+        elif player.bounding_box.left > MAPS["room_size"][0] and self.map.get_room(player.current_room + (1,0)) is not None:
+            player.current_room += (1,0)
+            player.set_pos((player.bounding_box.width, player.pos.y))
+            return True
+
+        elif player.bounding_box.top > MAPS["room_size"][1] and self.map.get_room(player.current_room + (0,1)) is not None:
+            player.current_room += (0,1)
+            player.set_pos((player.pos.x, player.bounding_box.height))
+            return True
+
+        elif player.bounding_box.bottom < 0 and self.map.get_room(player.current_room + (0,-1)) is not None:
+            player.current_room += (0,-1)
+            player.set_pos((player.pos.x, 0))
+            player.vel.y -= 10
+            return True
+
+        return False
+
+
+    def run(self, get_inputs: Callable[[], Dict[int, PlayerInput]], is_running: Callable[[], bool]):
+        """Steps the simulation at a fixed tick rate until is_running returns False
+
+        Args:
+            get_inputs (Callable[[], Dict[int, PlayerInput]]): returns the inputs of each player for the next tick
+            is_running (Callable[[], bool]): returns False when the simulation should stop
+        """
+        next_tick = perf_counter()
+
+        while is_running():
+            self.step(get_inputs())
+
+            next_tick += self.tick_interval
+            delay = next_tick - perf_counter()
+
+            if delay > 0:
+                sleep(delay)
+            else:
+                # the tick took too long, restart the schedule instead of rushing the next ticks
+                next_tick = perf_counter()
+
+
+    def __repr__(self) -> str:
+        return f"Simulation(tick_rate={self.tick_rate}, players={len(self.players)}, tick={self.tick})"
@@ -1,3 +1,3 @@
-from .data_structures import MovementKeys, AttackKeys
-from .file_worker import read_file
-from .bounding_box import BoundingBox
+from .data_structures import MovementKeys, AttackKeys, PlayerInput
+from .file_worker import read_file, load_json, compiled_path, save_compiled, load_compiled
+from .bounding_box import BoundingBox, Line, segment_entry, segment_entries, segments_entries, paired_segments_entries
@@ -1,30 +1,143 @@
-from typing import Sequence, Tuple, Union
-from numpy import array, float32
-from numpy.linalg import det
+from typing import Optional, Sequence, Tuple, Union
+from numpy import array, errstate, float64, fmax, fmin, maximum, minimum, ndarray, where, inf, hypot
 from pygame import Vector2, Rect
 
 Line = Sequence[Union[Vector2, Tuple[int, int]]]
 
 
-def _ccw(point: Vector2, line: Line) -> bool:
-    """Returns True if the given points are in counter clock wise order
+def segment_entry(x_a: float, y_a: float, x_b: float, y_b: float, left: float, top: float, right: float, bottom: float) -> Optional[float]:
+    """Returns how far along a segment it enters a box
+
+    The segment is clipped against the slabs of the box on each axis and
+    enters the box when it is inside both of them, the edges of the box
+    count as inside. It only uses float arithmetic so it's cheap enough
+    to call for every ray and hitbox on every tick
 
     Args:
-        point (Vector2): the first point
-        line (Line): the remaining two points
+        x_a (float): the x coord of the start of the segment
+        y_a (float): the y coord of the start of the segment
+        x_b (float): the x coord of the end of the segment
+        y_b (float): the y coord of the end of the segment
+        left (float): the left edge of the box
+        top (float): the top edge of the box
+        right (float): the right edge of the box
+        bottom (float): the bottom edge of the box
 
     Returns:
-        bool: True if the points are in counter clock wise order
+        Optional[float]: the fraction of the segment (0 to 1) before it enters the box,
+        0 if it starts inside, or None if they don't intersect
     """
-    arr = array(
-        (
-            (1, point[0], point[1]),
-            (1, line[0][0], line[0][1]),
-            (1, line[1][0], line[1][1])
-        ),
-        dtype=float32
-    )
-    return det(arr) > 0
+    enter = 0.0
+    leave = 1.0
+
+    delta = x_b - x_a
+    if delta == 0:
+        if x_a < left or x_a > right:
+            return None
+    else:
+        near = (left - x_a) / delta
+        far = (right - x_a) / delta
+        if near > far:
+            near, far = far, near
+
+        enter = max(enter, near)
+        leave = min(leave, far)
+        if enter > leave:
+            return None
+
+    delta = y_b - y_a
+    if delta == 0:
+        if y_a < top or y_a > bottom:
+            return None
+    else:
+        near = (top - y_a) / delta
+        far = (bottom - y_a) / delta
+        if near > far:
+            near, far = far, near
+
+        enter = max(enter, near)
+        leave = min(leave, far)
+        if enter > leave:
+            return None
+
+    return enter
+
+
+def segment_entries(line: Line, boxes: ndarray) -> Tuple[ndarray, ndarray]:
+    """Tests a segment against many boxes at once
+
+    Vectorized version of segment_entry
+
+    Args:
+        line (Line): the segment
+        boxes (ndarray): the left, top, right and bottom of each box (n x 4)
+
+    Returns:
+        Tuple[ndarray, ndarray]: a mask of the boxes that the segment hits and the distance
+        from the start of the segment to where it enters each box (pixels, inf on a miss)
+    """
+    hits, distances = segments_entries(array((line[0],), dtype=float64), array((line[1],), dtype=float64), boxes)
+
+    return hits[0], distances[0]
+
+
+def segments_entries(starts: ndarray, ends: ndarray, boxes: ndarray) -> Tuple[ndarray, ndarray]:
+    """Tests many segments against many boxes at once
+
+    Args:
+        starts (ndarray): the start of each segment (n x 2)
+        ends (ndarray): the end of each segment (n x 2)
+        boxes (ndarray): the left, top, right and bottom of each box (m x 4)
+
+    Returns:
+        Tuple[ndarray, ndarray]: a mask of the boxes that each segment hits and the distance
+        from the start of each segment to where it enters each box (n x m, pixels, inf on a miss)
+    """
+    return paired_segments_entries(starts[:, None], ends[:, None], boxes[None])
+
+
+def paired_segments_entries(starts: ndarray, ends: ndarray, boxes: ndarray) -> Tuple[ndarray, ndarray]:
+    """Tests each segment against the box at the same index
+
+    The arrays broadcast against each other like any numpy operation
+
+    Args:
+        starts (ndarray): the start of each segment (... x 2)
+        ends (ndarray): the end of each segment (... x 2)
+        boxes (ndarray): the left, top, right and bottom of each box (... x 4)
+
+    Returns:
+        Tuple[ndarray, ndarray]: a mask of the segments that hit their box and the distance
+        from the start of each segment to where it enters its box (pixels, inf on a miss)
+    """
+    x_a = starts[..., 0]
+    y_a = starts[..., 1]
+    delta_x = ends[..., 0] - x_a
+    delta_y = ends[..., 1] - y_a
+
+    left = boxes[..., 0]
+    top = boxes[..., 1]
+    right = boxes[..., 2]
+    bottom = boxes[..., 3]
+
+    # a segment parallel to an axis divides by 0, the boxes it misses
+    # on that axis are rejected below
+    with errstate(divide="ignore", invalid="ignore"):
+        near_x = (left - x_a) / delta_x
+        far_x = (right - x_a) / delta_x
+        near_y = (top - y_a) / delta_y
+        far_y = (bottom - y_a) / delta_y
+
+    # fmax and fmin skip the nan of a segment that starts on the edge of a slab it runs along
+    enter = fmax(fmax(minimum(near_x, far_x), minimum(near_y, far_y)), 0)
+    leave = fmin(fmin(maximum(near_x, far_x), maximum(near_y, far_y)), 1)
+
+    hits = enter <= leave
+    hits &= (delta_x != 0) | ((left <= x_a) & (x_a <= right))
+    hits &= (delta_y != 0) | ((top <= y_a) & (y_a <= bottom))
+
+    with errstate(invalid="ignore"):
+        return hits, where(hits, enter * hypot(delta_x, delta_y), inf)
 
 
 class BoundingBox(Rect):
@@ -36,29 +149,15 @@ class BoundingBox(Rect):
     def collideline(self, line: Line) -> bool:
         """Returns True if the given line collides with the given Rect
 
+        A line inside the Rect collides with it as well
+
         Args:
             line (Line): a line to check the collisions
 
         Returns:
             bool: True if collided, False otherwise
         """
-
-        rect_sides = (
-            (self.bottomleft, self.topleft),
-            (self.bottomright, self.topright),
-            (self.topleft, self.topright),
-            (self.bottomleft,self.bottomright)
-        )
-
-        for rect_side in rect_sides:
-            # calculating the determinants
-            r_first_la = _ccw(line[0], rect_side)
-            r_first_lb = _ccw(line[1], rect_side)
-
-            l_second_ra = _ccw(rect_side[0], line)
-            l_second_rb = _ccw(rect_side[1], line)
-
-            if r_first_la != r_first_lb and l_second_ra != l_second_rb:
-                return True
-
-        return False
+        return segment_entry(
+            line[0][0], line[0][1], line[1][0], line[1][1],
+            self.left, self.top, self.right, self.bottom
+        ) is not None
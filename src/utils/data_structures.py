@@ -9,3 +9,7 @@ class MovementKeys(TypedDict):
 class AttackKeys(TypedDict):
     attack: bool
     guard: bool
+
+class PlayerInput(TypedDict):
+    movement: MovementKeys
+    attack: AttackKeys
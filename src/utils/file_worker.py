@@ -1,3 +1,21 @@
+from functools import lru_cache
+from json import load
+import logging
+from mmap import mmap, ACCESS_READ
+from os import replace
+from os.path import exists, getmtime, splitext
+from struct import error as struct_error, pack, unpack_from
+from typing import Dict, Optional
+
+from numpy import ascontiguousarray, frombuffer, ndarray, prod
+
+
+# the compiled files start with this sequence and their arrays start at multiples of the alignment
+COMPILED_MAGIC = b"ASSETS\x00\x01"
+COMPILED_ALIGNMENT = 16
+COMPILED_EXTENSION = ".bin"
+
+
 def read_file(path: str):
     """Reads a file on the given path
 
@@ -12,3 +30,128 @@ def read_file(path: str):
         data = file
 
     return data
+
+
+@lru_cache(maxsize=None)
+def load_json(path: str):
+    """Reads and parses a json file only once, the following calls
+    return the same object so it must not be modified
+
+    Args:
+        path (str): the path to the file
+
+    Returns:
+        Any: the parsed contents of the file
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return load(file)
+
+
+def compiled_path(path: str) -> str:
+    """Returns the path of the compiled version of a json file
+
+    Args:
+        path (str): the path to the json file
+
+    Returns:
+        str: the path to the compiled file next to it
+    """
+    return splitext(path)[0] + COMPILED_EXTENSION
+
+
+def save_compiled(path: str, arrays: Dict[str, ndarray]):
+    """Writes the compiled version of a json file
+
+    The file starts with the name, type, shape and offset of each array
+    followed by their raw data, aligned so they can be read in place.
+    It's written next to the final file and then moved over it so that
+    a running game never reads a partially written file
+
+    Args:
+        path (str): the path to the json file
+        arrays (Dict[str, ndarray]): the arrays to store
+    """
+    arrays = {name: ascontiguousarray(array_) for name, array_ in arrays.items()}
+
+    entries = [
+        (name.encode("utf-8"), array_.dtype.str.encode("ascii"), array_.shape)
+        for name, array_ in arrays.items()
+    ]
+    header_size = len(COMPILED_MAGIC) + 4 + sum(
+        2 + len(name) + 1 + len(dtype) + 1 + 4 * len(shape) + 8 for name, dtype, shape in entries
+    )
+
+    header = bytearray(COMPILED_MAGIC + pack("<I", len(entries)))
+    data = bytearray()
+    for (name, dtype, shape), array_ in zip(entries, arrays.values()):
+        data.extend(bytes(-(header_size + len(data)) % COMPILED_ALIGNMENT))
+
+        header.extend(pack("<H", len(name)) + name + pack("<B", len(dtype)) + dtype)
+        header.extend(pack(f"<B{len(shape)}I", len(shape), *shape))
+        header.extend(pack("<Q", header_size + len(data)))
+
+        data.extend(array_.tobytes())
+
+    compiled = compiled_path(path)
+    temporary = compiled + ".tmp"
+
+    with open(temporary, "wb") as file:
+        file.write(header)
+        file.write(data)
+
+    replace(temporary, compiled)
+
+
+@lru_cache(maxsize=None)
+def load_compiled(path: str) -> Optional[Dict[str, ndarray]]:
+    """Reads the compiled version of a json file only once, the following calls
+    return the same arrays so they must not be modified
+
+    The arrays are read in place from the memory mapped file.
+    The json file is the source of the compiled one, so a json file that
+    was modified after it was compiled is used instead
+
+    Args:
+        path (str): the path to the json file
+
+    Returns:
+        Optional[Dict[str, ndarray]]: the arrays or None if the json file must be loaded instead
+    """
+    compiled = compiled_path(path)
+    if not exists(compiled) or (exists(path) and getmtime(path) > getmtime(compiled)):
+        return None
+
+    try:
+        with open(compiled, "rb") as file:
+            data = mmap(file.fileno(), 0, access=ACCESS_READ)
+
+        if data[:len(COMPILED_MAGIC)] != COMPILED_MAGIC:
+            raise ValueError("not a compiled asset")
+
+        (count,) = unpack_from("<I", data, len(COMPILED_MAGIC))
+        position = len(COMPILED_MAGIC) + 4
+
+        arrays: Dict[str, ndarray] = dict()
+        for _ in range(count):
+            (name_size,) = unpack_from("<H", data, position)
+            name = data[position + 2:position + 2 + name_size].decode("utf-8")
+            position += 2 + name_size
+
+            (dtype_size,) = unpack_from("<B", data, position)
+            dtype = data[position + 1:position + 1 + dtype_size].decode("ascii")
+            position += 1 + dtype_size
+
+            (dimensions,) = unpack_from("<B", data, position)
+            shape = unpack_from(f"<{dimensions}I", data, position + 1)
+            position += 1 + 4 * dimensions
+
+            (offset,) = unpack_from("<Q", data, position)
+            position += 8
+
+            arrays[name] = frombuffer(data, dtype=dtype, count=prod(shape, dtype=int), offset=offset).reshape(shape)
+
+    except (OSError, ValueError, struct_error) as error:
+        logging.warning("Can't read '%s' (%s), loading the json file instead", compiled, error)
+        return None
+
+    return arrays
@@ -3,103 +3,127 @@ from math import cos, sin, radians
 
 from pygame.draw import line
 from pygame import Vector2, Surface
-from numpy import array, matmul
 
-from utils import BoundingBox
+from utils import BoundingBox, segment_entry
 
 
 class Hitbox:
     def __init__(self, *points: Tuple[float, float]) -> None:
-        lines: List[List[Vector2]] = list()
+        """Constructor of the class Hitbox
 
-        for i in range(-1, len(points) - 1):
-            lines.append([Vector2(points[i]), Vector2(points[i + 1])])
+        The points are the vertices of a convex polygon in order
 
+        Args:
+            points (Tuple[float, float]): the vertices of the hitbox
+        """
         self.center = Vector2(0, 0)
-        for _line in lines:
-            self.center += _line[0]
-        self.center /= len(lines)
+        for point in points:
+            self.center += point
+        self.center /= len(points)
 
         self.angle: float = 0
 
-        self.relative_vectors = [
-            [self.center - _line[0], self.center - _line[1]] for _line in lines
+        # position of each vertex relative to the center when the hitbox isn't rotated
+        self.offsets: List[Tuple[float, float]] = [
+            (point[0] - self.center.x, point[1] - self.center.y) for point in points
         ]
 
+        # world position of the vertices and the box around them (left, top, right, bottom),
+        # calculated by transform so every test of the same tick reuses them
+        self.points: List[Tuple[float, float]] = list()
+        self.aabb: Tuple[float, float, float, float] = (0, 0, 0, 0)
+
+        self.transform()
+
     def set_pos(self, pos: Vector2):
         """Sets the hitbox's center to a new position
 
+        The world position of the hitbox only changes on the next transform
+
         Args:
             pos (Vector2): the new position
-            direction (float): the direction that the hitbox must be rotating
         """
         self.center.update(pos)
 
     def set_rotation(self, angle: float):
         """Sets the rotation of the hitbox to a new value
 
+        The world position of the hitbox only changes on the next transform
+
         Args:
             angle (float): the new angle
         """
         self.angle = angle
 
-    def rotate(self, point: Vector2) -> Vector2:
-        """Rotates a given point of the hitbox
-
-        Args:
-            point (Vector2): the point to rotate
-
-        Returns:
-            Vector2: the rotated point
+    def transform(self):
+        """Calculates the world position of the vertices of the hitbox
+        and the box around them from its center and rotation
         """
-        angle = self.angle
-        rotation_matrix = array(
-            (
-                (cos(radians(angle)), -sin(radians(angle))),
-                (sin(radians(angle)), cos(radians(angle))),
-            )
-        )
+        angle_cos = cos(radians(self.angle))
+        angle_sin = sin(radians(self.angle))
+        center_x, center_y = self.center
 
-        new_point = matmul(rotation_matrix, point - self.center)
+        self.points = [
+            (center_x + x * angle_cos - y * angle_sin, center_y + x * angle_sin + y * angle_cos)
+            for x, y in self.offsets
+        ]
 
-        return self.center + Vector2(new_point[0], new_point[1])
+        xs = [point[0] for point in self.points]
+        ys = [point[1] for point in self.points]
+        self.aabb = (min(xs), min(ys), max(xs), max(ys))
 
     def colliderect(self, bbox: BoundingBox) -> bool:
         """Returns true if the hitbox collides with a given BoundingBox
 
+        The box around the hitbox rejects most of the bounding boxes and the
+        remaining ones are checked against the axes of the edges of the hitbox.
+        Like the edge test that it replaces, only an edge of the hitbox that
+        touches the bounding box is a hit, a bounding box that is completely
+        inside of the hitbox isn't
+
         Args:
             bbox (BoundingBox): the bounding box to check collisions with
 
         Returns:
             bool: True if it collided, False otherwise
         """
-        for vector in self.relative_vectors:
-            if bbox.collideline(
-                (
-                    self.rotate(self.center - vector[0]),
-                    self.rotate(self.center - vector[1]),
-                )
-            ):
+        left, top, right, bottom = self.aabb
+
+        # the axes of the bounding box
+        if right < bbox.left or left > bbox.right or bottom < bbox.top or top > bbox.bottom:
+            return False
+
+        corners = (bbox.topleft, bbox.topright, bbox.bottomright, bbox.bottomleft)
+
+        # the axes perpendicular to the edges of the hitbox
+        for i in range(-1, len(self.points) - 1):
+            axis_x = self.points[i][1] - self.points[i + 1][1]
+            axis_y = self.points[i + 1][0] - self.points[i][0]
+
+            hitbox_projections = [x * axis_x + y * axis_y for x, y in self.points]
+            bbox_projections = [x * axis_x + y * axis_y for x, y in corners]
+
+            if max(hitbox_projections) < min(bbox_projections) or max(bbox_projections) < min(hitbox_projections):
+                return False
+
+        # the shapes overlap, check that it isn't only the bounding box inside of the hitbox
+        for i in range(-1, len(self.points) - 1):
+            if segment_entry(
+                self.points[i][0], self.points[i][1], self.points[i + 1][0], self.points[i + 1][1],
+                bbox.left, bbox.top, bbox.right, bbox.bottom
+            ) is not None:
                 return True
 
+        return False
+
     def blit(self, canvas: Surface):
         """Draws the hitbox on the given surface
 
         Args:
             canvas (Surface): the surface to draw the hibox on
         """
-        for vector in self.relative_vectors:
-            line(
-                canvas,
-                "red",
-                self.rotate(self.center - vector[0]),
-                self.rotate(self.center - vector[1]),
-            )
+        for i in range(-1, len(self.points) - 1):
+            line(canvas, "red", self.points[i], self.points[i + 1])
 
     def __repr__(self) -> str:
-        string = "Hitbox("
-        for i, vector in enumerate(self.relative_vectors):
-            string += str(self.center - vector[0])
-            if i < len(self.relative_vectors) - 1:
-                string += ", "
-        return string + ")"
+        return "Hitbox(" + ", ".join(str(Vector2(point)) for point in self.points) + ")"
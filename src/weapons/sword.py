@@ -13,6 +13,7 @@ class Sword(Weapon):
             (50,2.5)
         )
         self.hitbox.set_pos(self.follow_line[0])
+        self.hitbox.transform()
 
         self.attack_animations = [
             "sword_attack"
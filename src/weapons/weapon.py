@@ -71,6 +71,9 @@ class Weapon:
         angle = direction * self.angle + self.attachment.angle
         self.hitbox.set_rotation(angle)
 
+        # every target of the tick is tested against the same world position
+        self.hitbox.transform()
+
 
     def validate_attack(self, keyframe: int, attack_sequence: int) -> bool:
         """Returns true if the attack animation